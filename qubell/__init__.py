@@ -21,7 +21,11 @@ __email__ = "vkhomenko@qubell.com"
 
 import warnings
 
-warnings.simplefilter('always', DeprecationWarning)
+
+class QubellDeprecationWarning(DeprecationWarning):
+    """Deprecated api of this package, it is always shown, unlike deprecations of other packages"""
+
+warnings.simplefilter('always', QubellDeprecationWarning)
 
 
 def doublewrap(f):
@@ -55,7 +59,7 @@ def deprecated(func, msg=None):
 
     @functools.wraps(func)
     def wrapper_func(*args, **kwargs):
-        warnings.warn(message, DeprecationWarning, stacklevel=2)
+        warnings.warn(message, QubellDeprecationWarning, stacklevel=2)
         return func(*args, **kwargs)
 
     return wrapper_func
\ No newline at end of file
@@ -28,8 +28,7 @@ import logging as log
 import simplejson as json
 
 from qubell.api.private import exceptions
-from qubell.api.private.common import QubellEntityList, Entity
-from qubell.api.provider.router import ROUTER as router
+from qubell.api.private.common import QubellEntityList, Entity, cached_json
 
 
 class Application(Entity):
@@ -38,6 +37,7 @@ class Application(Entity):
     """
 
     def __init__(self, organization, id):
+        self.router = organization.router
         self.organization = organization
         self.organizationId = self.organization.organizationId
         self.applicationId = self.id = id
@@ -58,7 +58,7 @@ class Application(Entity):
 
     @property
     def name(self):
-        return self.json()['name']
+        return self._field('name')
 
 
 
@@ -73,7 +73,7 @@ class Application(Entity):
     def new(organization, name, manifest):
         log.info("Creating application: %s" % name)
 
-        resp = router.post_organization_application(org_id=organization.organizationId,
+        resp = organization.router.post_organization_application(org_id=organization.organizationId,
                                                     files={'path': manifest.content},
                                                     data={'manifestSource': 'upload', 'name': name})
         app = Application(organization, resp.json()['id'])
@@ -82,7 +82,7 @@ class Application(Entity):
 
     def delete(self):
         log.info("Removing application: %s" % self.name)
-        router.delete_application(org_id=self.organizationId, app_id=self.applicationId)
+        self.router.delete_application(org_id=self.organizationId, app_id=self.applicationId)
         return True
 
     def update(self, **kwargs):
@@ -91,21 +91,27 @@ class Application(Entity):
         log.info("Updating application: %s" % self.name)
 
         data = json.dumps(kwargs)
-        resp = router.put_application(org_id=self.organizationId, app_id=self.applicationId, data=data)
+        resp = self.router.put_application(org_id=self.organizationId, app_id=self.applicationId, data=data)
         return resp.json()
 
     def clean(self, timeout=3):
-        for ins in self.instances:
+        def destroy(ins):
             st = ins.status
             if st not in ['Destroyed', 'Destroying', 'Launching', 'Executing']: # Tests could fail and we can get any state here
                 log.info("Destroying instance %s" % ins.name)
                 ins.delete()
                 assert ins.destroyed(timeout=timeout)
-                self.instances.remove(ins)
 
-        for rev in self.revisions:
-            self.revisions.remove(rev)
-            rev.delete()
+        # instance lists are refetched on access, so nothing to remove from them
+        with self.router.batch() as batch:
+            for ins in self.instances:
+                batch.submit(destroy, ins)
+        batch.raise_errors()
+
+        with self.router.batch() as batch:
+            for rev in self.revisions:
+                batch.submit(rev.delete)
+        batch.raise_errors()
 
         @retry(5, 1 , 2 , AssertionError)
         def eventually_clean():
@@ -115,8 +121,13 @@ class Application(Entity):
         eventually_clean()
         return True
 
+    @cached_json
     def json(self):
-        return router.get_application(org_id=self.organizationId, app_id=self.applicationId).json()
+        return self.router.get_application(org_id=self.organizationId, app_id=self.applicationId).json()
+
+    def json_async(self):
+        """Same as json, but returns AsyncResult, use .get() to wait for json"""
+        return self.router.async_router.submit(self.json)
 
     def list_instances_json(self):
         instances = self.json()['instances']
@@ -149,7 +160,7 @@ class Application(Entity):
                     'applicationName': self.name,
                     'version': version,
                     'instanceId': instance.instanceId})
-        resp = router.post_revision(org_id=self.organizationId, app_id=self.applicationId, data=payload)
+        resp = self.router.post_revision(org_id=self.organizationId, app_id=self.applicationId, data=payload)
         return self.get_revision(id=resp.json()['id'])
 
     def delete_revision(self, id):
@@ -158,12 +169,12 @@ class Application(Entity):
 # MANIFEST
 
     def get_manifest(self):
-        return router.post_application_refresh(org_id=self.organizationId, app_id=self.applicationId).json()
+        return self.router.post_application_refresh(org_id=self.organizationId, app_id=self.applicationId).json()
 
     def upload(self, manifest):
         log.info("Uploading manifest")
         self.manifest = manifest
-        return router.post_application_manifest(org_id=self.organizationId, app_id=self.applicationId,
+        return self.router.post_application_manifest(org_id=self.organizationId, app_id=self.applicationId,
                                     files={'path': manifest.content},
                                     data={'manifestSource': 'upload', 'name': self.name}).json()
 
@@ -13,7 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from collections import namedtuple
+from functools import wraps
 import logging as log
+import os
 import time
 
 from qubell.api.tools import is_bson_id
@@ -29,7 +31,57 @@ __email__ = "vkhomenko@qubell.com"
 
 IdName = namedtuple('IdName', 'id,name')
 
+# False makes entities fetch json on every access, e.g. for tests of platform changes made outside
+ENTITY_CACHE = not os.environ.get('QUBELL_NO_ENTITY_CACHE')
+
+
+def cached_json(fn):
+    """
+    Decorator of entity json method: json is kept for json_ttl seconds of entity class.
+    It is fetched again after invalidate(), after router sent POST/PUT/DELETE (entity changes included)
+    and on every call, if ENTITY_CACHE is False.
+    """
+    @wraps(fn)
+    def json(self):
+        cached = self.__dict__.get('_json_cache')  # not getattr, entities fetch unknown attributes in __getattr__
+        if cached is not None and ENTITY_CACHE:
+            taken_at, writes, value = cached
+            if time.time() - taken_at < self.json_ttl and writes == self.router.writes:
+                return value
+        taken_at, writes = time.time(), self.router.writes
+        value = fn(self)
+        self._json_cache = (taken_at, writes, value)
+        return value
+    return json
+
+
 class Entity(object):
+    """
+    Entity, got from list, is seeded with its summary there: summary_fields and name are read from it
+    instead of own json, while list snapshot is fresh (see EntityList).
+    Json of entity is cached for json_ttl seconds, see cached_json.
+    """
+    summary_fields = ()
+    json_ttl = 1.0
+    _summary = None
+
+    def seed(self, summary, taken, ttl):
+        self._summary = (summary, taken, ttl)
+        return self
+
+    def invalidate(self):
+        """Drops cached json and summary, so fields are fetched again"""
+        self.__dict__.pop('_json_cache', None)
+        self._summary = None
+
+    def _field(self, key):
+        """Returns field from summary, if it has one and is fresh, else from json"""
+        if self._summary is not None and ENTITY_CACHE:
+            summary, (taken_at, writes), ttl = self._summary
+            if key in summary and time.time() - taken_at < ttl and writes == self.router.writes:
+                return summary[key]
+        return self.json()[key]
+
     def __eq__(self, other):
         return self.id == other.id
     def __ne__(self, other):
@@ -38,50 +90,100 @@ class Entity(object):
 class EntityList(object):
     """ Class to store qubell objects information (Instances, Applications, etc)
     Gives convenient way for searching and manipulating objects, it caches only id and names.
+    Ids and names are snapshot, fetched on first use and again when it is older than ttl seconds
+    or router sent POST/PUT/DELETE since, refresh() fetches it at once. Iteration goes over one snapshot.
     """
+    ttl = 1.0
+    router = None
 
-    def __init__(self):
+    def __init__(self, ttl=None):
         self._list = []
+        self._taken = None  # (time, router writes) of snapshot
+        self._indexed = None  # (snapshot, by id, by name)
+        self._summaries = {}  # id: summary of entity in snapshot
+        if ttl is not None:
+            self.ttl = ttl
+
+    def refresh(self):
+        """Fetches new snapshot"""
+        writes = self.router and self.router.writes
         self._id_name_list()
+        self._taken = (time.time(), writes)
+        return self
+
+    def _snapshot(self):
+        taken = self._taken
+        if taken is None or time.time() - taken[0] >= self.ttl or (self.router and self.router.writes != taken[1]):
+            self.refresh()
+        return self._list
 
     def __iter__(self):
-        self._id_name_list()
-        for i in self._list:
+        for i in self._snapshot():
             yield self._get_item(i)
 
     def __len__(self):
-        self._id_name_list()
-        return len(self._list)
+        return len(self._snapshot())
 
     def __repr__(self):
+        """Shows snapshot as it is, repr never fetches"""
         return "{0}({1})".format(self.__class__.__name__, str(self._list))
 
+    def _indexes(self):
+        """Returns {id: (position, IdName)} and {name: (position, IdName)} of snapshot, built once per snapshot"""
+        snapshot = self._snapshot()
+        indexed = self._indexed
+        if indexed is None or indexed[0] is not snapshot:
+            by_id, by_name = {}, {}
+            for position, id_name in enumerate(snapshot):  # the last of duplicates wins
+                by_id[id_name.id] = by_name[id_name.name] = (position, id_name)
+            indexed = self._indexed = (snapshot, by_id, by_name)
+        return indexed[1], indexed[2]
+
     def __getitem__(self, item):
-        self._id_name_list()
-        if isinstance(item, int): return self._get_item(self._list[item])
-        elif isinstance(item, slice): return [self._get_item(i) for i in self._list[item]]
+        if isinstance(item, int): return self._get_item(self._snapshot()[item])
+        elif isinstance(item, slice): return [self._get_item(i) for i in self._snapshot()[item]]
 
-        found = [x for x in self._list if (is_bson_id(item) and x.id == item) or x.name == item]
+        by_id, by_name = self._indexes()
+        found = [x for x in (is_bson_id(item) and by_id.get(item), by_name.get(item)) if x]
         if len(found) is 0:
             raise exceptions.NotFoundError("None of '{1}' in {0}".format(self.__class__.__name__, item))
-        return self._get_item(found[-1])
+        return self._get_item(max(found)[1])
 
     def __contains__(self, item):
-        self._id_name_list()
+        by_id, by_name = self._indexes()
         if isinstance(item, str) or isinstance(item, unicode):
             if is_bson_id(item):
-                return item in [item.id for item in self._list]
+                return item in by_id
             else:
-                return item in [item.name for item in self._list]
-        return item.id in [item.id for item in self._list]
+                return item in by_name
+        return item.id in by_id
 
     @deprecated('Entity List is updated via _id_name_list, this is dangerous to use this method')
     def add(self, entry):
-        self._list.append(IdName(entry.id, entry.name))
+        self._list = self._snapshot() + [IdName(entry.id, entry.name)]  # iterations in progress keep old snapshot
 
     @deprecated('Entity List is updated via _id_name_list, this is dangerous to use this method')
     def remove(self, entry):
-        self._list.remove(IdName(entry.id, entry.name))
+        snapshot = list(self._snapshot())
+        snapshot.remove(IdName(entry.id, entry.name))
+        self._list = snapshot
+
+    def _take(self, entities, summary_fields=()):
+        """Sets snapshot of IdName from json of entities, keeps their names and summary_fields to seed items"""
+        fields = ('name',) + summary_fields
+        id_names, summaries = [], {}
+        for ent in entities:
+            id_names.append(IdName(ent['id'], ent['name']))
+            summaries[ent['id']] = {key: ent[key] for key in fields if key in ent}
+        self._summaries = summaries
+        self._list = id_names
+
+    def _seed(self, entity, id_name):
+        """Seeds entity with its summary from snapshot"""
+        summary = self._summaries.get(id_name.id)
+        if summary is not None:
+            entity.seed(summary, self._taken, self.ttl)
+        return entity
 
     def _id_name_list(self):
         """Returns list of IdName tuple"""
@@ -98,13 +200,14 @@ class QubellEntityList(EntityList):
     def __init__(self, list_json_method, organization):
         self.organization = organization
         self.organizationId = self.organization.organizationId
+        self.router = organization.router
         self.json = list_json_method
         EntityList.__init__(self)
 
 
     def _id_name_list(self):
         # start = time.time()
-        self._list = [IdName(ent['id'], ent['name']) for ent in self.json()]
+        self._take(self.json(), getattr(self, 'base_clz', Entity).summary_fields)
         # end = time.time()
         # elapsed = int((end - start) * 1000.0)
         # log.debug(
@@ -114,7 +217,7 @@ class QubellEntityList(EntityList):
     def _get_item(self, id_name):
         assert self.base_clz, "Define 'base_clz' in constructor or override this method"
         start = time.time()
-        entity = self.base_clz(organization=self.organization, id=id_name.id)
+        entity = self._seed(self.base_clz(organization=self.organization, id=id_name.id), id_name)
         end = time.time()
         elapsed = int((end - start) * 1000.0)
         log.debug(
@@ -24,12 +24,13 @@ import logging as log
 import simplejson as json
 
 from qubell.api.private import exceptions
-from qubell.api.private.common import QubellEntityList, Entity
-from qubell.api.provider.router import ROUTER as router
+from qubell.api.private.common import QubellEntityList, Entity, cached_json
 
 class Environment(Entity):
+    summary_fields = ('isDefault', 'backend')
 
     def __init__(self, organization, id):
+        self.router = organization.router
         self.organization = organization
         self.organizationId = self.organization.organizationId
         self.environmentId = self.id = id
@@ -43,7 +44,7 @@ class Environment(Entity):
 
     @lazyproperty
     def zoneId(self):
-        return self.json()['backend']
+        return self._field('backend')
 
     @lazyproperty
     def services(self):
@@ -52,11 +53,11 @@ class Environment(Entity):
 
     @property
     def name(self):
-        return self.json()['name']
+        return self._field('name')
 
     @property
     def isDefault(self):
-        return self.json()['isDefault']
+        return self._field('isDefault')
 
     def __getattr__(self, key):
         resp = self.json()
@@ -73,7 +74,7 @@ class Environment(Entity):
                 'name': name,
                 'backend': zone,
                 'organizationId': organization.organizationId}
-        resp = router.post_organization_environment(org_id=organization.organizationId, data=json.dumps(data)).json()
+        resp = organization.router.post_organization_environment(org_id=organization.organizationId, data=json.dumps(data)).json()
         return Environment(organization, id=resp['id'])
 
     def restore(self, config):
@@ -97,24 +98,25 @@ class Environment(Entity):
                      "parameter": "publicKeyId",
                      "value": serv.regenerate()['id']})
 
+    @cached_json
     def json(self):
-        return router.get_environment(org_id=self.organizationId, env_id=self.environmentId).json()
+        return self.router.get_environment(org_id=self.organizationId, env_id=self.environmentId).json()
 
     def delete(self):
-        router.delete_environment(org_id=self.organizationId, env_id=self.environmentId)
+        self.router.delete_environment(org_id=self.organizationId, env_id=self.environmentId)
         return True
 
     def set_as_default(self):
         data = json.dumps({'environmentId': self.id})
-        return router.put_organization_default_environment(org_id=self.organizationId, data=data).json()
+        return self.router.put_organization_default_environment(org_id=self.organizationId, data=data).json()
 
     def list_available_services_json(self):
-        return router.get_environment_available_services(org_id=self.organizationId, env_id=self.environmentId).json()
+        return self.router.get_environment_available_services(org_id=self.organizationId, env_id=self.environmentId).json()
 
     def list_services_json(self):
         return self.json()['services']
 
-    _put_environment = lambda self, data: router.put_environment(org_id=self.organizationId, env_id=self.environmentId, data=data)
+    _put_environment = lambda self, data: self.router.put_environment(org_id=self.organizationId, env_id=self.environmentId, data=data)
 
     def add_service(self, service):
         data = self.json()
@@ -20,4 +20,8 @@ class ApiAuthenticationError(ApiError): pass
 
 class ApiNotFoundError(ApiError): pass
 
+class ApiTimeoutError(ApiError): pass
+
+class CircuitOpenError(ApiError): pass
+
 api_http_code_errors = {401: ApiUnauthorizedError, 403: ApiAuthenticationError, 404: ApiNotFoundError}
\ No newline at end of file
@@ -30,8 +30,7 @@ from qubell.api.tools import lazyproperty
 
 from qubell.api.tools import waitForStatus as waitForStatus
 from qubell.api.private import exceptions
-from qubell.api.private.common import QubellEntityList, Entity
-from qubell.api.provider.router import ROUTER as router
+from qubell.api.private.common import QubellEntityList, Entity, cached_json
 
 DEAD_STATUS = ['Destroyed', 'Destroying']
 
@@ -39,24 +38,26 @@ class Instance(Entity, ServiceMixin):
     """
     Base class for application instance. Manifest required.
     """
+    summary_fields = ('status', 'applicationId', 'environmentId')
+    json_ttl = 0.3  # status is polled
 
     def __init__(self, organization, id):
+        self.router = organization.router
         self.instanceId = self.id = id
         self.organization = organization
         self.organizationId = organization.organizationId
 
-        self.__cached_json = None
         self._last_workflow_started_time = None
 
     @lazyproperty
-    def applicationId(self): return self.json()['applicationId']
+    def applicationId(self): return self._field('applicationId')
 
     @lazyproperty
     def application(self):
         return self.organization.applications[self.applicationId]
 
     @lazyproperty
-    def environmentId(self): return self.json()['environmentId']
+    def environmentId(self): return self._field('environmentId')
 
     @lazyproperty
     def environment(self): return self.organization.get_environment(self.environmentId)
@@ -66,10 +67,10 @@ class Instance(Entity, ServiceMixin):
         return InstanceList(list_json_method=lambda: self.json()['submodules'], organization=self.organization)
 
     @property
-    def status(self): return self.json()['status']
+    def status(self): return self._field('status')
 
     @property
-    def name(self): return self.json()['name']
+    def name(self): return self._field('name')
 
     def __parse(self, values):
         return dict({val['id']: val['value'] for val in values})
@@ -99,27 +100,23 @@ class Instance(Entity, ServiceMixin):
 
     def _cache_free(self):
         """Frees cache"""
-        self.__cached_json = None
+        self.invalidate()
 
     def fresh(self):
-        #todo: create decorator from this
-        if self.__cached_json is None:
-            return False
-        now = time.time()
-        elapsed = (now - self.__last_read_time) * 1000.0
-        return elapsed < 300
+        cached = self.__dict__.get('_json_cache')
+        return cached is not None and time.time() - cached[0] < self.json_ttl
 
+    @cached_json
     def json(self):
         '''
-        return __cached_json, if accessed withing 300 ms.
+        return cached json, if accessed withing json_ttl (300 ms).
         This allows to optimize calls when many parameters of entity requires withing short time.
         '''
+        return self.router.get_instance(org_id=self.organizationId, instance_id=self.instanceId).json()
 
-        if self.fresh():
-            return self.__cached_json
-        self.__last_read_time = time.time()
-        self.__cached_json = router.get_instance(org_id=self.organizationId, instance_id=self.instanceId).json()
-        return self.__cached_json
+    def json_async(self):
+        """Same as json, but returns AsyncResult, use .get() to wait for json"""
+        return self.router.async_router.submit(self.json)
 
     @staticmethod
     def new(application, revision=None, environment=None, name=None, parameters=None, destroyInterval=None):
@@ -137,7 +134,7 @@ class Instance(Entity, ServiceMixin):
 
         data = json.dumps(parameters)
         before_creation = time.gmtime(time.time())
-        resp = router.post_organization_instance(org_id=application.organizationId, app_id=application.applicationId, data=data)
+        resp = application.router.post_organization_instance(org_id=application.organizationId, app_id=application.applicationId, data=data)
         instance = Instance(organization=application.organization, id=resp.json()['id'])
         instance._last_workflow_started_time = before_creation
         return instance
@@ -150,15 +147,27 @@ class Instance(Entity, ServiceMixin):
     def destroyed(self, timeout=3):  # Shortcut for convinience. Temeout = 3 min (ask timeout*6 times every 10 sec)
         return waitForStatus(instance=self, final='Destroyed', accepted=['Destroying', 'Running'], timeout=[timeout*20, 3, 1])
 
+    def ready_async(self, timeout=3):
+        """Waits for instance in background, returns AsyncResult of ready"""
+        return self.router.async_router.submit_wait(self.ready, timeout)
+
+    def destroyed_async(self, timeout=3):
+        """Waits for instance in background, returns AsyncResult of destroyed"""
+        return self.router.async_router.submit_wait(self.destroyed, timeout)
+
     def run_workflow(self, name, parameters=None):
         if not parameters: parameters = {}
         log.info("Running workflow %s" % name)
         self._last_workflow_started_time = time.gmtime(time.time())
-        router.post_instance_workflow(org_id=self.organizationId, instance_id=self.instanceId, wf_name=name, data=json.dumps(parameters))
+        self.router.post_instance_workflow(org_id=self.organizationId, instance_id=self.instanceId, wf_name=name, data=json.dumps(parameters))
         return True
 
+    def run_workflow_async(self, name, parameters=None):
+        """Same as run_workflow, but returns AsyncResult"""
+        return self.router.async_router.submit(self.run_workflow, name, parameters)
+
     def get_manifest(self):
-        return router.post_application_refresh(org_id=self.organizationId, app_id=self.applicationId).json()
+        return self.router.post_application_refresh(org_id=self.organizationId, app_id=self.applicationId).json()
 
     def reconfigure(self, revision=None, parameters=None):
         #note: be carefull refactoring this, or you might have unpredictable results
@@ -175,12 +184,12 @@ class Instance(Entity, ServiceMixin):
         if parameters is not None:
             payload['parameters'] = parameters
 
-        resp = router.put_instance_configuration(org_id=self.organizationId, instance_id=self.instanceId, data=json.dumps(payload))
+        resp = self.router.put_instance_configuration(org_id=self.organizationId, instance_id=self.instanceId, data=json.dumps(payload))
         return resp.json()
 
     def rename(self, name):
         payload = json.dumps({'instanceName': name})
-        return router.put_instance_configuration(org_id=self.organizationId, instance_id=self.instanceId, data=payload)
+        return self.router.put_instance_configuration(org_id=self.organizationId, instance_id=self.instanceId, data=payload)
 
     def delete(self):
         self.destroy()
@@ -204,7 +213,7 @@ class Instance(Entity, ServiceMixin):
         else:
             assert isinstance(environment_ids, list)
             data = environment_ids
-        router.post_instance_services(org_id=self.organizationId, instance_id=self.instanceId, data=json.dumps(data))
+        self.router.post_instance_services(org_id=self.organizationId, instance_id=self.instanceId, data=json.dumps(data))
 
     def remove_as_service(self, environments=None):
         if not environments:
@@ -248,4 +257,12 @@ class Instance(Entity, ServiceMixin):
 
 
 class InstanceList(QubellEntityList):
-    base_clz = Instance
\ No newline at end of file
+    base_clz = Instance
+
+    def fetch_json(self, max_workers=10):
+        """Fetches json of every instance concurrently, returns them in list order"""
+        with self.organization.router.batch(max_workers=max_workers) as batch:
+            for instance in self:
+                batch.submit(instance.json)
+        batch.raise_errors()
+        return batch.results
\ No newline at end of file
@@ -18,8 +18,6 @@ __copyright__ = "Copyright 2013, Qubell.com"
 __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
-import requests
-import yaml
 import os
 
 class Manifest(object):
@@ -32,6 +30,7 @@ class Manifest(object):
         if url:
             self.url = url
             self.source = url
+            import requests
             self.content = requests.get(url).content
         elif content:
             self.source = 'Text'
@@ -64,6 +63,7 @@ class Manifest(object):
             dictionary = pathGet(dictionary, "/".join(path[:-1]))
             dictionary[key] = value
 
+        import yaml
         src = yaml.load(self.content)
         pathSet(src, path, value)
         self.content = yaml.safe_dump(src, default_flow_style=False)
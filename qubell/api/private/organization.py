@@ -12,9 +12,10 @@
 # implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections import OrderedDict
 import warnings
-from qubell import deprecated
-from qubell.api.private.common import EntityList, IdName
+from qubell import deprecated, QubellDeprecationWarning
+from qubell.api.private.common import EntityList, Entity, cached_json
 from qubell.api.private.service import system_application_types, COBALT_SECURE_STORE_TYPE, WORKFLOW_SERVICE_TYPE, \
     SHARED_INSTANCE_CATALOG_TYPE
 from qubell.api.tools import lazyproperty
@@ -33,26 +34,34 @@ from qubell.api.private.instance import InstanceList, DEAD_STATUS, Instance
 from qubell.api.private.application import ApplicationList
 from qubell.api.private.environment import EnvironmentList
 from qubell.api.private.zone import ZoneList
-from qubell.api.provider.router import ROUTER as router
+from qubell.api.provider.router import ROUTER
 
 
-class Organization(object):
+class Organization(Entity):
+    """
+    Organization of tenant, all its entities talk to tenant via the same router, global ROUTER by default.
+    Nothing is fetched until fields are read.
+    """
+    summary_fields = ('backends',)
 
-    def __init__(self, id, auth=None):
+    def __init__(self, id, auth=None, router=None):
+        self.router = router or ROUTER
         self.providers = []
 
-        self.organizationId = id
+        self.organizationId = self.id = id
 
-        my = self.json()
-        self.name = my['name']
+    @property
+    def name(self):
+        return self._field('name')
 
     @staticmethod
-    def new(name):
+    def new(name, router=None):
         log.info("Creating organization: %s" % name)
+        router = router or ROUTER
         payload = json.dumps({'editable': 'true',
                               'name': name})
         resp = router.post_organization(data=payload)
-        return Organization(resp.json()['id'])
+        return Organization(resp.json()['id'], router=router)
 
     @lazyproperty
     def environments(self):
@@ -60,6 +69,7 @@ class Organization(object):
 
     @lazyproperty
     def instances(self):
+        # not streamed: list refreshes go through response cache, coalescing and revalidation (304)
         return InstanceList(list_json_method=self.list_instances_json, organization=self)
 
     @lazyproperty
@@ -79,17 +89,30 @@ class Organization(object):
     @property
     def zone(self): return self.get_default_zone()
 
+    @cached_json
     def json(self):
-        resp = router.get_organizations()
+        resp = self.router.get_organizations()
         org = [x for x in resp.json() if x['id'] == self.organizationId]
         if len(org)>0:
             return org[0]
         return resp.json()
 
     def restore(self, config):
+        # instances are looked up or launched concurrently, so the same instance must not be asked twice,
+        # later entries of it get the instance of the first one, as they would if run one by one
+        unique = OrderedDict()
         for instance in config.pop('instances', []):
-            launched = self.get_or_launch_instance(id=instance.pop('id', None), name=instance.pop('name'), **instance)
-            assert launched.ready()
+            id, name = instance.pop('id', None), instance.pop('name')
+            unique.setdefault(('id', id) if id else ('name', name), dict(instance, id=id, name=name))
+        with self.router.batch() as batch:
+            for instance in unique.values():
+                batch.submit(self.get_or_launch_instance, **instance)
+        batch.raise_errors()
+        with self.router.batch() as ready:
+            for launched in batch.results:
+                ready.submit(launched.ready)
+        ready.raise_errors()
+        assert all(ready.results)
         for serv in config.pop('services',[]):
             self.get_or_create_service(id=serv.pop('id', None), name=serv.pop('name'), type=serv.pop('type', None))
         for prov in config.get('providers', []):
@@ -123,7 +146,7 @@ class Organization(object):
     def list_applications_json(self):
         """ Return raw json
         """
-        return router.get_applications(org_id=self.organizationId).json()
+        return self.router.get_applications(org_id=self.organizationId).json()
 
     def delete_application(self, id):
         app = self.get_application(id)
@@ -203,12 +226,26 @@ class Organization(object):
     def list_instances_json(self, application=None):
         """ Get list of instances in json format converted to list"""
         if application:  # todo: application should not be parameter here. Application should do its own list
-            warnings.warn("organization.list_instances_json(app) is deprecated, use app.list_instances_json", DeprecationWarning, stacklevel=2)
+            warnings.warn("organization.list_instances_json(app) is deprecated, use app.list_instances_json", QubellDeprecationWarning, stacklevel=2)
             instances = application.list_instances_json()
         else:  # Return all instances in organization
-            instances = router.get_instances(org_id=self.organizationId).json()
+            instances = self.router.get_instances(org_id=self.organizationId).json()
         return [ins for ins in instances if ins['status'] not in DEAD_STATUS]
 
+    def iter_instances_json(self):
+        """
+        Same as list_instances_json, but yields instances one at a time, as dashboard is received,
+        e.g. for reports over large organizations. Streamed request is never cached, coalesced or revalidated.
+        """
+        response = self.router.get_instances(org_id=self.organizationId, stream=True)
+        for ins in response.iter_json():
+            if ins['status'] not in DEAD_STATUS:
+                yield ins
+
+    def list_instances_json_async(self, application=None):
+        """Same as list_instances_json, but returns AsyncResult"""
+        return self.router.async_router.submit(self.list_instances_json, application)
+
     def get_or_create_instance(self, id=None, application=None, revision=None, environment=None, name=None, parameters=None,
                                destroyInterval=None):
         """ Get instance by id or name.
@@ -274,7 +311,7 @@ class Organization(object):
     get_service = get_instance
 
     def list_services_json(self):
-        return router.get_services(org_id=self.organizationId).json()
+        return self.router.get_services(org_id=self.organizationId).json()
 
     def get_or_create_service(self, id=None, application=None, revision=None, environment=None, name=None, parameters=None,
                               destroyInterval=None):
@@ -298,7 +335,7 @@ class Organization(object):
         return Environment.new(organization=self,name=name, zone=zone, default=default)
 
     def list_environments_json(self):
-        return router.get_environments(org_id=self.organizationId).json()
+        return self.router.get_environments(org_id=self.organizationId).json()
 
     def get_environment(self, id=None, name=None):
         """ Get environment object by name or id.
@@ -386,11 +423,11 @@ class Organization(object):
     def create_provider(self, name, parameters):
         log.info("Creating provider: %s" % name)
         parameters['name'] = name
-        resp = router.post_provider(org_id=self.organizationId, data=json.dumps(parameters))
+        resp = self.router.post_provider(org_id=self.organizationId, data=json.dumps(parameters))
         return self.get_provider(resp.json()['id'])
 
     def list_providers_json(self):
-        return router.get_providers(org_id=self.organizationId).json()
+        return self.router.get_providers(org_id=self.organizationId).json()
 
     @deprecated("use list_providers_json instead")
     def list_providers(self): return self.list_providers_json()
@@ -432,7 +469,7 @@ class Organization(object):
 ### ZONES
 
     def list_zones_json(self):
-        return router.get_zones(org_id=self.organizationId).json()
+        return self.router.get_zones(org_id=self.organizationId).json()
 
     def get_zone(self, id=None, name=None):
         """ Get zone object by name or id.
@@ -452,7 +489,7 @@ class Organization(object):
 
     def get_default_zone(self):
     # Zones(backends) are factor we can't controll. So, get them.
-        backends = self.json()['backends']
+        backends = self._field('backends')
         zones = [bk for bk in backends if bk['isDefault']==True]
         if len(zones):
             zoneId = zones[0]['id']
@@ -460,10 +497,11 @@ class Organization(object):
         raise exceptions.NotFoundError('Unable to get default zone')
 
 class OrganizationList(EntityList):
-    def __init__(self, list_json_method):
+    def __init__(self, list_json_method, router=None):
         self.json = list_json_method
+        self.router = router or ROUTER
         EntityList.__init__(self)
     def _id_name_list(self):
-        self._list = [IdName(ent['id'], ent['name']) for ent in self.json()]
+        self._take(self.json(), Organization.summary_fields)
     def _get_item(self, id_name):
-        return Organization(id=id_name.id)
\ No newline at end of file
+        return self._seed(Organization(id=id_name.id, router=self.router), id_name)
\ No newline at end of file
@@ -19,8 +19,8 @@ import simplejson as json
 from qubell.api.private import exceptions
 from qubell.api.private.organization import OrganizationList, Organization
 
-from qubell.api.provider.router import ROUTER as router
-from qubell import deprecated
+from qubell.api.provider.router import ROUTER
+from qubell import deprecated, QubellDeprecationWarning
 
 #todo: understood, that some people may use this object for authentication, need to move this to proper place
 
@@ -37,15 +37,21 @@ __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
 class QubellPlatform(object):
-    def __init__(self, auth=None, context=None):
+    """
+    Entry point to tenant. Platform and all entities, that are got from it, use the same router,
+    global ROUTER by default, so separate routers let one process work with several tenants or users:
+        platform = QubellPlatform.connect(tenant, user, password, router=Router(tenant))
+    """
+    def __init__(self, auth=None, context=None, router=None):
         if context:
-            warnings.warn("replace context with auth name, it is deprecated and will be removed", DeprecationWarning,
+            warnings.warn("replace context with auth name, it is deprecated and will be removed", QubellDeprecationWarning,
                           stacklevel=2)
         self.auth = auth or context
+        self.router = router or ROUTER
 
     @staticmethod
-    def connect(tenant, user, password):
-
+    def connect(tenant, user, password, router=None):
+        router = router or ROUTER
         router.base_url = tenant
         router.connect(user, password)
 
@@ -53,31 +59,31 @@ class QubellPlatform(object):
         router.tenant = tenant
         router.user = user
         router.password = password
-        return QubellPlatform(auth=router)
+        return QubellPlatform(auth=router, router=router)
 
     @deprecated('use QubellPlatform.connect instead')
     def authenticate(self):
-        router.base_url = self.auth.tenant
-        router.connect(self.auth.user, self.auth.password)
+        self.router.base_url = self.auth.tenant
+        self.router.connect(self.auth.user, self.auth.password)
         #todo: remove following, left for compatibility
-        self.auth.cookies = router._cookies
+        self.auth.cookies = self.router._cookies
         return True
 
     def list_organizations_json(self):
-        resp = router.get_organizations()
+        resp = self.router.get_organizations()
         return resp.json()
 
     @lazyproperty
     def organizations(self):
-        return OrganizationList(self.list_organizations_json)
+        return OrganizationList(self.list_organizations_json, router=self.router)
 
     def create_organization(self, name):
-        return Organization.new(name)
+        return Organization.new(name, router=self.router)
 
     def get_organization(self, id=None, name=None):
         log.info("Picking organization: %s" % id)
         if id:
-            return Organization(id) #speed-up, to avoid fetching all organizations
+            return Organization(id, router=self.router) #speed-up, to avoid fetching all organizations
         else:
             return self.organizations[name]
 
@@ -19,18 +19,17 @@ __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
 from qubell.api.private import exceptions
-from qubell.api.provider.router import ROUTER as router
+from qubell.api.private.common import Entity, cached_json
 
 
-class Provider(object):
+class Provider(Entity):
 
     def __init__(self, organization, id, auth=None):
+        self.router = organization.router
         self.auth = auth
-        self.providerId = id
+        self.providerId = self.id = id
         self.organization = organization
         self.organizationId = organization.organizationId
-        my = self.json()
-        #self.__dict__.update(my)
 
     def __getattr__(self, key):
         resp = self.json()
@@ -38,12 +37,13 @@ class Provider(object):
             raise exceptions.NotFoundError('Cannot get property %s' % key)
         return resp[key] or False
 
+    @cached_json
     def json(self):
-        resp = router.get_providers(org_id=self.organizationId)
+        resp = self.router.get_providers(org_id=self.organizationId)
         provider = [x for x in resp.json() if x['id'] == self.providerId]
         if len(provider)>0:
             return provider[0]
 
     def delete(self):
-        router.delete_provider(org_id=self.organizationId,prov_id=self.providerId)
+        self.router.delete_provider(org_id=self.organizationId,prov_id=self.providerId)
         return True
\ No newline at end of file
@@ -12,7 +12,7 @@
 # implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from qubell.api.private.common import EntityList, Entity, IdName
+from qubell.api.private.common import EntityList, Entity, cached_json
 
 __author__ = "Vasyl Khomenko"
 __copyright__ = "Copyright 2013, Qubell.com"
@@ -20,7 +20,6 @@ __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
 from qubell.api.private import exceptions
-from qubell.api.provider.router import ROUTER as router
 
 class Revision(Entity):
     """
@@ -28,12 +27,15 @@ class Revision(Entity):
     """
 
     def __init__(self, application, id):
+        self.router = application.router
         self.revisionId = self.id = id
         self.application = application
         self.organizationId = self.application.organizationId
         self.applicationId = self.application.applicationId
-        my = self.json()
-        self.name = my['name']
+
+    @property
+    def name(self):
+        return self._field('name')
 
     def __getattr__(self, key):
         resp = self.json()
@@ -41,11 +43,12 @@ class Revision(Entity):
             return resp[key] or False
         raise exceptions.NotFoundError('Cannot get revision property %s' % key)
 
+    @cached_json
     def json(self):
-        return router.get_revision(org_id=self.organizationId, app_id=self.applicationId, rev_id=self.revisionId).json()
+        return self.router.get_revision(org_id=self.organizationId, app_id=self.applicationId, rev_id=self.revisionId).json()
 
     def delete(self):
-        router.delete_revision(org_id=self.organizationId, app_id=self.applicationId, rev_id=self.revisionId)
+        self.router.delete_revision(org_id=self.organizationId, app_id=self.applicationId, rev_id=self.revisionId)
         return True
 
 class RevisionList(EntityList):
@@ -55,8 +58,9 @@ class RevisionList(EntityList):
         self.applicationId=application.id
         self.organization=application.organization
         self.organization=application.organization.organizationId
+        self.router = application.router
         EntityList.__init__(self)
     def _id_name_list(self):
-        self._list = [IdName(ent['id'], ent['name']) for ent in self.json()]
+        self._take(self.json())
     def _get_item(self, id_name):
-        return Revision(id=id_name.id, application=self.application)
+        return self._seed(Revision(id=id_name.id, application=self.application), id_name)
@@ -18,10 +18,7 @@ __copyright__ = "Copyright 2013, Qubell.com"
 __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
-import yaml
-
 from qubell.api.private import exceptions
-from qubell.api.provider.router import ROUTER as router
 
 
 COBALT_SECURE_STORE_TYPE = 'builtin:cobalt_secure_store'
@@ -39,10 +36,11 @@ SHARED_INSTANCES_PARAMETER_NAME = 'configuration.shared-instances'
 # noinspection PyUnresolvedReferences
 class ServiceMixin(object):
     def regenerate(self):
-        return router.post_service_generate(org_id=self.organizationId, instance_id=self.instanceId).json()
+        return self.router.post_service_generate(org_id=self.organizationId, instance_id=self.instanceId).json()
 
 
     def add_shared_instance(self, revision, instance):
+        import yaml
         params = self.parameters
         if SHARED_INSTANCES_PARAMETER_NAME in params:
             old = yaml.safe_load(params[SHARED_INSTANCES_PARAMETER_NAME])
@@ -53,6 +51,7 @@ class ServiceMixin(object):
         self.reconfigure(parameters=params)
 
     def remove_shared_instance(self, instance):
+        import yaml
         params = self.parameters
         if SHARED_INSTANCES_PARAMETER_NAME in params:
             old = yaml.safe_load(params[SHARED_INSTANCES_PARAMETER_NAME])
@@ -70,4 +69,5 @@ class ServiceMixin(object):
                     instance.name, self.name))
 
     def list_shared_instances(self):
+        import yaml
         return yaml.safe_load(self.parameters[SHARED_INSTANCES_PARAMETER_NAME])
\ No newline at end of file
@@ -351,18 +351,26 @@ class SandBox(object):
                         instances_to_destroy.append(instance)
 
             # destroy non-service instances first
-            for instance in instances_to_destroy:
-                instance.destroy()
-            for instance in services_to_destroy:
-                instance.destroy()
+            for group in (instances_to_destroy, services_to_destroy):
+                with self.organization.router.batch() as batch:
+                    for instance in group:
+                        batch.submit(instance.destroy)
+                batch.raise_errors()
 
             return services_to_destroy + instances_to_destroy
 
-        for instance in destroy(self.sandbox['instances']):
-            if not instance.destroyed(timeout):
+        destroyed = destroy(self.sandbox['instances'])
+        with self.organization.router.batch() as batch:
+            for instance in destroyed:
+                batch.submit(instance.destroyed, timeout)
+        for instance, ok, error in zip(destroyed, batch.results, batch.errors):
+            if error is not None:
+                log.error("Instance {0}: {1} failed to be destroyed: {2}".format(instance.id, instance.name, error))
+            elif not ok:
                 log.error(
                     "Instance was not destroyed properly {0}: {1}", instance.id, instance.name
                 )
+        batch.raise_errors()
 
         log.info("Sandbox cleaned")
 
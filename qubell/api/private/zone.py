@@ -19,21 +19,22 @@ __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
 from qubell.api.private import exceptions
-from qubell.api.private.common import QubellEntityList, Entity
-from qubell.api.provider.router import ROUTER as router
+from qubell.api.private.common import QubellEntityList, Entity, cached_json
 
 class Zone(Entity):
     def __init__(self, organization, id):
+        self.router = organization.router
         self.zoneId = self.id = id
         self.organizationId = organization.organizationId
         self.organization = organization
 
     @property
     def name(self):
-        return self.json()['name']
+        return self._field('name')
 
+    @cached_json
     def json(self):
-        resp = router.get_zones(org_id=self.organizationId)
+        resp = self.router.get_zones(org_id=self.organizationId)
         zone = [x for x in resp.json() if x['id'] == self.zoneId]
         if len(zone)>0:
             return zone[0]
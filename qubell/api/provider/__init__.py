@@ -1,88 +1,250 @@
 from functools import wraps
 import inspect
 import logging as log
+from string import Formatter
 
-import requests
 import time
-import sys
 
-from qubell.api.private.exceptions import ApiError, api_http_code_errors
+from qubell.api.private.exceptions import ApiError, ApiTimeoutError, ApiUnauthorizedError, CircuitOpenError, \
+    api_http_code_errors
+from qubell.api.provider.breaker import FAILURE_CODES
+from qubell.api.provider.response import ApiResponse
+from qubell.api.provider.retry import DEFAULT_RETRY
+from qubell.api.provider.stats import RouteMetrics
 
 
 log.getLogger("requests.packages.urllib3.connectionpool").setLevel(log.WARN)
 
-_routes_stat = {}
+routes_stat = RouteMetrics()
 
-def route(route_str):  # decorator param
+BYPASS_PARAMS = ("data", "cookies", "auth", "files", "stream")
+
+
+class Route(object):
+    """
+    Route declaration compiled once per decorated method:
+    http method, pre-parsed url template with its placeholders, defaults of the method and parameters passed to request.
+    """
+
+    def __init__(self, route_str, f, idempotent=None, retry=None, timeout=None):
+        self.route_str = route_str
+        self.method, self.url = route_str.split(" ")
+        self.parts = [(literal, field) for literal, field, _, _ in Formatter().parse(self.url)]
+        self.placeholders = [field for _, field in self.parts if field is not None]
+
+        f_args, varargs, keywords, defaults = inspect.getargspec(f)
+        defaults = defaults or ()
+        self.defaults = dict(zip(f_args[len(f_args) - len(defaults):], defaults))
+        self.required = f_args[1:len(f_args) - len(defaults)]
+        self.bypass = BYPASS_PARAMS if keywords else tuple(p for p in BYPASS_PARAMS if p in f_args)
+        # files are sent as multipart, content type is never forced for such routes
+        self.multipart = "files" in self.required
+        # responses of GET can be cached, other methods invalidate cached ones of the same organization
+        self.cacheable = self.method == "GET"
+        self.scope = "org_id"
+        # only calls, that are safe to repeat, are retried
+        self.idempotent = self.cacheable if idempotent is None else idempotent
+        if retry is None:
+            retry = DEFAULT_RETRY if self.idempotent else False
+        self.retry = retry or None
+        self.timeout = timeout
+
+    def __repr__(self):
+        return "Route({0})".format(self.route_str)
+
+    def path(self, route_args):
+        try:
+            return "".join([literal if field is None else literal + format(route_args[field])
+                            for literal, field in self.parts])
+        except KeyError as e:
+            raise AttributeError("Define {0} as named argument for route.".format(e))  # KeyError in format have a message with key
+
+    def request_args(self, route_args, path):
+        bypass_args = {param: route_args[param] for param in self.bypass if param in route_args}
+
+        #add json content type for:
+        # - all public api, meaning have basic auth
+        # - private that ends with .json
+        # - unless files are sent
+        if not self.multipart and "files" not in bypass_args and (path.endswith('.json') or "auth" in route_args):
+            bypass_args['headers'] = {'Content-Type': 'application/json'}
+        return bypass_args
+
+
+def route(route_str, idempotent=None, retry=None, timeout=None):  # decorator param
     """
     Provides play2 likes routes, with python formatter
     All string fileds should be named parameters
     :param route_str: a route "GET /parent/{parentID}/child/{childId}{ctype}"
-    :return: the response of requests.request
+    :param idempotent: call is safe to repeat, by default only GET is
+    :param retry: RetryPolicy of idempotent route, False to never retry, by default DEFAULT_RETRY
+    :param timeout: (connect, read) timeouts in seconds, overrides ones of router
+    :return: the response of router transport request
     """
-    def ilog(elapsed):
-        #statistic
-        last_stat = _routes_stat.get(route_str, {"count": 0, "min": sys.maxint, "max": 0, "avg": 0})
-        last_count = last_stat["count"]
-        _routes_stat[route_str] = {
-            "count": last_count + 1,
-            "min": min(elapsed, last_stat["min"]),
-            "max": max(elapsed, last_stat["max"]),
-            "avg": (last_count * last_stat["avg"] + elapsed) / (last_count + 1)
-        }
-        log.debug(' Route Time: {0} took {1} ms'.format(route_str, elapsed))
+    def ilog(elapsed, **stat):
+        routes_stat.record(route_str, elapsed, **stat)
+        log.debug(' Route Time: {0} took {1} ms'.format(route_str, int(elapsed)))
 
 
     def wrapper(f):  # decorated function
-        @wraps(f)
-        def wrapped_func(*args, **kwargs):  # params of function
-            self = args[0]
-            method, url = route_str.split(" ")
+        compiled = Route(route_str, f, idempotent, retry, timeout)
+        method = compiled.method
+
+        def attempt(self, destination_url, bypass_args, sent):
+            """Single request under breaker, governor and deadline, returns response and elapsed ms"""
+            timeout = self.request_timeout(compiled.timeout)
+            if timeout is not None:
+                bypass_args = dict(bypass_args, timeout=timeout)
+            breakers = self.breakers
+            if breakers is None:
+                return guarded(self, destination_url, bypass_args, sent)
 
-            def defaults_dict():
-                f_args, varargs, keywords, defaults = inspect.getargspec(f)
-                defaults = defaults or []
-                return dict(zip(f_args[-len(defaults):], defaults))
+            breaker = breakers.route(route_str)
+            state = breaker.state
+            allowed = breaker.allow()
+            if not allowed:
+                routes_stat.increment(route_str, "breaker_rejected")
+                raise CircuitOpenError("Route {0} {1} is cut off by open circuit breaker, retry in {2:.1f} s".format(
+                    method, destination_url, breaker.retry_in))
+            try:
+                response, elapsed = guarded(self, destination_url, bypass_args, sent)
+            except Exception:
+                breaker.record(failed=True)
+                raise
+            else:
+                breaker.record(failed=response.status_code in FAILURE_CODES)
+                return response, elapsed
+            finally:
+                if breaker.state != state:
+                    routes_stat.breaker_state(route_str, self.base_url, breaker.state)
+
+        def guarded(self, destination_url, bypass_args, sent):
+            governor, limit = self.governor, None
+            if governor is not None:
+                waited, limit = governor.acquire(self.current_deadline)
+                if waited:
+                    routes_stat.increment(route_str, "limiter_waits")
+                    routes_stat.increment(route_str, "limiter_wait_ms", waited * 1000.0)
+            start = time.time()
+            try:
+                response = ApiResponse(self.transport.request(method, destination_url, verify=self.verify_ssl,
+                                                              **bypass_args), bypass_args.get("stream", False))
+            except Exception as e:
+                if limit is not None:
+                    limit.release(failed=True)
+                ilog((time.time() - start) * 1000.0, error=e.__class__.__name__, sent=sent)
+                from requests.exceptions import Timeout  # loaded by transport already
+                if isinstance(e, Timeout):
+                    raise ApiTimeoutError("Route {0} {1} timed out: {2}".format(method, destination_url, e))
+                raise
+            elapsed = (time.time() - start) * 1000.0
+            if limit is not None:
+                limit.release(response.status_code, elapsed)
+            return response, elapsed
 
-            defs = defaults_dict()
+        def send(self, path, route_args):
+            destination_url = self.base_url + path
+            bypass_args = compiled.request_args(route_args, path)
+            sent = _body_size(bypass_args.get('data'), bypass_args.get('files'))
 
-            route_args = dict(defs.items() + kwargs.items())
+            validators = self.validators if compiled.cacheable and not route_args.get("stream") else None
+            known = validators.get(destination_url) if validators is not None else None
+            if known is not None:
+                bypass_args['headers'] = dict(bypass_args.get('headers') or {}, **validators.conditions(known))
 
-            def get_destination_url():
+            policy = compiled.retry
+            retries = policy.schedule(self.current_deadline) if policy else None
+            while True:
                 try:
-                    return url.format(**route_args)
-                except KeyError as e:
-                    raise AttributeError("Define {0} as named argument for route.".format(e))  # KeyError in format have a message with key
+                    response, elapsed = attempt(self, destination_url, bypass_args, sent)
+                except Exception as e:
+                    if retries is None or not policy.retry_error(e):
+                        raise
+                    delay = next(retries, None)
+                    if delay is None:
+                        raise
+                else:
+                    if retries is None or not policy.retry_status(response.status_code):
+                        break
+                    delay = next(retries, None)
+                    if delay is None:
+                        break
+                    ilog(elapsed, status=response.status_code, sent=sent, received=_response_size(response))
+                routes_stat.increment(route_str, "retries")
+                log.debug(' Route {0} {1} is retried in {2:.2f} s'.format(method, path, delay))
+                time.sleep(delay)
 
-            destination_url = self.base_url + get_destination_url()
-            f(*args, **kwargs)  # generally this is "pass"
+            if known is not None and response.status_code == 304:
+                routes_stat.increment(route_str, "not_modified")
+                ilog(elapsed, status=304, sent=sent, received=_response_size(response))
+                return known.copy()
+            if validators is not None and response.status_code == 200:
+                validators.put(destination_url, response)
 
-            bypass_args = {param: route_args[param] for param in ["data", "cookies", "auth", "files"] if param in route_args}
+            error = None
+            try:
+                if self.verify_codes:
+                    if response.status_code is not 200:
+                        msg = "Route {0} {1} returned code={2} and error: {3}".format(method, path, response.status_code,
+                                                                                  response.text)
+                        if response.status_code in api_http_code_errors.keys():
+                            error = api_http_code_errors[response.status_code]
+                        else:
+                            log.debug(response.text)
+                            error = ApiError
+                        raise error(msg)
+                return response
+            finally:
+                ilog(elapsed, status=response.status_code, error=error and error.__name__, sent=sent,
+                     received=_response_size(response))
 
-            #add json content type for:
-            # - all public api, meaning have basic auth
-            # - private that ends with .json
-            # - unless files are sent
-            if "files" not in bypass_args and (destination_url.endswith('.json') or "auth" in route_args):
-                bypass_args['headers'] = {'Content-Type': 'application/json'}
+        def send_once(self, path, route_args):
+            """Coalesces identical GET requests in flight, if router allows"""
+            if self.flights is None or not compiled.cacheable:
+                return send(self, path, route_args)
+            response, shared = self.flights.do(self.base_url + path, lambda: send(self, path, route_args),
+                                               self.current_deadline)
+            if shared:
+                routes_stat.increment(route_str, "coalesced")
+                return response.copy()  # decoded json is not shared
+            return response
 
-            start = time.time()
-            response = requests.request(method, destination_url, verify=self.verify_ssl, **bypass_args)
-            end = time.time()
-            elapsed = int((end - start) * 1000.0)
-            ilog(elapsed)
-
-            if self.verify_codes:
-                if response.status_code is not 200:
-                    msg = "Route {0} {1} returned code={2} and error: {3}".format(method, get_destination_url(), response.status_code,
-                                                                              response.text)
-                    if response.status_code in api_http_code_errors.keys():
-                        raise api_http_code_errors[response.status_code](msg)
-                    else:
-                        log.debug(response.text)
-                        raise ApiError(msg)
+        def send_cached(self, cache, path, route_args):
+            if not compiled.cacheable:
+                try:
+                    return send(self, path, route_args)
+                finally:
+                    cache.invalidate(route_args.get(compiled.scope))  # write-through, even if failed
+
+            key = self.base_url + path
+            response = cache.get(key)
+            if response is not None:
+                routes_stat.increment(route_str, "cache_hits")
+                return response.copy()
+            response = send_once(self, path, route_args)
+            if response.status_code == 200:
+                cache.put(key, route_args.get(compiled.scope), response)
             return response
 
+        @wraps(f)
+        def wrapped_func(*args, **kwargs):  # params of function
+            self = args[0]
+            route_args = dict(compiled.defaults, **kwargs)
+            path = compiled.path(route_args)
+            f(*args, **kwargs)  # generally this is "pass"
+
+            try:
+                if route_args.get("stream"):  # body is read by caller, such response can not be shared
+                    return send(self, path, route_args)
+                cache = self.cache
+                if cache is None:
+                    return send_once(self, path, route_args)
+                return send_cached(self, cache, path, route_args)
+            finally:
+                if not compiled.cacheable:
+                    self.writes += 1  # snapshots of entity lists, taken before, are stale
+
+        wrapped_func.route = compiled
         return wrapped_func
 
     return wrapper
@@ -90,16 +252,26 @@ def route(route_str):  # decorator param
 
 def play_auth(f):
     """
-    Injects cookies, into requests call over route
+    Injects cookies, into requests call over route.
+    If session expired (401), router signs in again once and request is repeated.
     :return: route
     """
 
+    @wraps(f)
     def wrapper(*args, **kwargs):
         self = args[0]
         if "cookies" in kwargs:
             raise AttributeError("don't set cookies explicitly")
         assert self.is_connected, "not connected, call router.connect(email, password) first"
         assert self._cookies, "no cookies and connected o_O"
+        session = self.session
+        kwargs["cookies"] = self._cookies
+        try:
+            return f(*args, **kwargs)
+        except ApiUnauthorizedError:
+            if not self.reconnect(session):
+                raise
+        routes_stat.increment(f.route.route_str, "reauthenticated")
         kwargs["cookies"] = self._cookies
         return f(*args, **kwargs)
 
@@ -112,6 +284,7 @@ def basic_auth(f):
     :return: route
     """
 
+    @wraps(f)
     def wrapper(*args, **kwargs):
         self = args[0]
         if "auth" in kwargs:
@@ -123,6 +296,44 @@ def basic_auth(f):
 
     return wrapper
 
+def _body_size(data, files=None):
+    """Bytes of request body: string or form fields and uploaded files, multipart framing is not counted"""
+    if isinstance(data, basestring):
+        size = len(data)
+    elif isinstance(data, dict):
+        size = sum(len(str(key)) + _content_size(value if isinstance(value, basestring) else str(value))
+                   for key, value in data.items())
+    else:
+        size = 0
+    for upload in (files.values() if isinstance(files, dict) else [value for _, value in files or []]):
+        if isinstance(upload, (tuple, list)):  # (filename, content[, content type[, headers]])
+            upload = upload[1]
+        size += _content_size(upload)
+    return size
+
+
+def _content_size(content):
+    """Length of string or of file from its current position, file is not read"""
+    if isinstance(content, basestring):
+        return len(content)
+    try:
+        position = content.tell()
+        content.seek(0, 2)
+        size = content.tell() - position
+        content.seek(position)
+        return size
+    except (AttributeError, IOError, ValueError):
+        return 0
+
+
+def _response_size(response):
+    length = response.headers.get('Content-Length')
+    if length is not None:
+        return int(length)
+    if response.streamed:  # not read yet
+        return 0
+    return len(response.content or '')
+
+
 def log_routes_stat():
-    nice_stat = ["  count: {0:<4} min: {1:<6} avg: {2:<6} max: {3:<6}  {4}".format(stat["count"], stat["min"], stat["avg"], stat["max"], r) for r, stat in _routes_stat.items()]
-    log.info("Route Statistic\n{0}".format("\n".join(nice_stat)))
\ No newline at end of file
+    log.info("Route Statistic\n{0}".format("\n".join(routes_stat.log_lines())))
\ No newline at end of file
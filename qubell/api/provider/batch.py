@@ -0,0 +1,87 @@
+"""
+Concurrent execution of many router calls with bounded number of workers.
+"""
+import sys
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+
+def _capture(router, deadline, func, args, kwargs):
+    try:
+        with router.deadline_at(deadline):
+            return func(*args, **kwargs), None
+    except Exception:
+        return None, sys.exc_info()[1]
+
+
+class Batch(object):
+    """
+    Issues submitted calls concurrently, at most max_workers at once, over pooled connections of router.
+    Routes of router can be called on batch directly, any other callable goes via submit:
+
+        with router.batch(max_workers=10) as batch:
+            for instance in instances:
+                batch.get_instance(org_id=org_id, instance_id=instance.id)
+            batch.submit(app.json)
+        batch.results  # in submission order, None for failed calls
+        batch.errors   # exception or None per call
+
+    Exceptions of calls do not stop others, they are collected per call.
+    Deadline of router in submitting thread applies to calls.
+    """
+
+    def __init__(self, router, max_workers=10):
+        self.router = router
+        self.max_workers = max_workers
+        self.results = []
+        self.errors = []
+        self._pending = []
+        self._pool = None
+
+    def submit(self, func, *args, **kwargs):
+        """Schedules call, returns its index in results"""
+        if self._pool is None:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(self.max_workers)
+        self._pending.append(self._pool.apply_async(_capture, (self.router, self.router.current_deadline, func,
+                                                               args, kwargs)))
+        return len(self.results) + len(self._pending) - 1
+
+    def wait(self):
+        """Waits for scheduled calls, returns all results in submission order"""
+        for pending in self._pending:
+            result, error = pending.get()
+            self.results.append(result)
+            self.errors.append(error)
+        self._pending = []
+        return self.results
+
+    def raise_errors(self):
+        """Raises first collected error, if any"""
+        for error in self.errors:
+            if error is not None:
+                raise error
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.wait()
+        finally:
+            self.close()
+
+    def __getattr__(self, name):
+        method = getattr(self.router, name)
+        if not hasattr(method, "route"):
+            raise AttributeError("'{0}' is not a route of {1}".format(name, self.router.__class__.__name__))
+        return lambda **kwargs: self.submit(method, **kwargs)
@@ -0,0 +1,125 @@
+"""
+Circuit breakers of routes: calls of failing route fail fast for a while instead of loading tenant further.
+Breakers are shared per tenant base url, so all routers of one tenant see the same state.
+"""
+from collections import deque
+import threading
+import time
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_CODES = (429, 500, 502, 503, 504)
+
+
+class CircuitBreaker(object):
+    """
+    Breaker of one route. Closed breaker lets calls through and keeps outcomes of last 'window' of them,
+    it opens when at least 'min_calls' are seen and share of failed ones reaches 'error_ratio'.
+    Open breaker rejects calls for 'reset_timeout' seconds, then turns half open:
+    'trial_calls' calls are let through, breaker closes if all of them succeed and opens again on first failure.
+    """
+
+    def __init__(self, error_ratio=0.5, min_calls=10, window=20, reset_timeout=30.0, trial_calls=1):
+        self.error_ratio = error_ratio
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.trial_calls = trial_calls
+
+        self.state = CLOSED
+        self.opened_at = None
+        self._outcomes = deque(maxlen=window)  # True for failed call
+        self._trials = 0
+        self._passed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def retry_in(self):
+        """Seconds until open breaker lets trial call through"""
+        if self.state != OPEN:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.time())
+
+    def allow(self):
+        """Returns True if call may be sent, every allowed call must be followed by record"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.time() < self.opened_at + self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._trials = self._passed = 0
+            if self.state == HALF_OPEN:
+                if self._trials >= self.trial_calls:
+                    return False
+                self._trials += 1
+            return True
+
+    def record(self, failed):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self._passed += 1
+                    if self._passed >= self.trial_calls:
+                        self.state = CLOSED
+                        self._outcomes.clear()
+            elif self.state == CLOSED:
+                self._outcomes.append(failed)
+                calls = len(self._outcomes)
+                if calls >= self.min_calls and sum(self._outcomes) >= self.error_ratio * calls:
+                    self._open()
+            # outcome of call sent before breaker opened does not matter
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self._outcomes.clear()
+
+
+class CircuitBreakers(object):
+    """
+    Breakers of all routes of one tenant, created on first use with the same settings.
+    """
+
+    def __init__(self):
+        self.settings = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        """Applies CircuitBreaker settings, existing breakers are dropped"""
+        with self._lock:
+            self.settings = settings
+            self._breakers = {}
+        return self
+
+    def route(self, route_str):
+        with self._lock:
+            breaker = self._breakers.get(route_str)
+            if breaker is None:
+                breaker = self._breakers[route_str] = CircuitBreaker(**self.settings)
+            return breaker
+
+    def states(self):
+        with self._lock:
+            return {route_str: breaker.state for route_str, breaker in self._breakers.items()}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breakers_for(base_url):
+    """Returns breakers shared by all routers of tenant"""
+    with _breakers_lock:
+        breakers = _breakers.get(base_url)
+        if breakers is None:
+            breakers = _breakers[base_url] = CircuitBreakers()
+        return breakers
@@ -0,0 +1,100 @@
+"""
+Caches of GET responses, used by route layer when enabled on router:
+time bounded LRU cache and cache of responses revalidated by conditional GET.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+
+class ResponseCache(object):
+    """
+    Keeps responses by key (url) for ttl seconds, at most max_size of them, least recently used are evicted first.
+    Every entry belongs to scope (organization id or None for tenant wide routes),
+    invalidation of scope drops its entries and tenant wide ones.
+    """
+
+    def __init__(self, ttl=1.0, max_size=256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key: (expires, scope, response)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                return None
+            self._entries[key] = entry  # most recently used goes last
+            return entry[2]
+
+    def put(self, key, scope, response):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, scope, response)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scope=None):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[1] in (scope, None)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ValidatorCache(object):
+    """
+    Keeps last response with validators (ETag, Last-Modified) per key (url), at most max_size of them,
+    least recently used are evicted first. Such responses are revalidated by conditional GET, so they never expire.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key: response
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            response = self._entries.pop(key, None)
+            if response is not None:
+                self._entries[key] = response
+            return response
+
+    def put(self, key, response):
+        """Keeps response if it has validators, otherwise forgets previous one"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+                self._entries[key] = response
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    @staticmethod
+    def conditions(response):
+        """Returns headers of conditional request, that revalidates response"""
+        headers = {}
+        if response.headers.get('ETag'):
+            headers['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = response.headers['Last-Modified']
+        return headers
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,155 @@
+"""
+Recording of router traffic to cassette file and its replay without tenant:
+
+    with router.record("restore.cassette"):
+        organization.restore(config)
+
+    router = Router("http://replay", transport=ReplayTransport("restore.cassette"))
+
+Cassette is json line per request, gzipped if path ends with .gz.
+Secrets (passwords, credentials, tokens, emails, session cookie) are scrubbed.
+"""
+import gzip
+import re
+import threading
+import time
+from urlparse import urlparse
+
+import simplejson as json
+
+from qubell.api.provider.fake import FakeResponse
+from qubell.api.provider.transport import Transport
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+SECRET_FIELDS = re.compile(r"password|secret|credential|token|private|email", re.IGNORECASE)
+SCRUBBED = "***"
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def scrub(value):
+    """Replaces values of secret fields in dicts, lists and json strings"""
+    if isinstance(value, dict):
+        return dict((k, SCRUBBED if SECRET_FIELDS.search(k) else scrub(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [scrub(v) for v in value]
+    if isinstance(value, basestring) and value[:1] in ("{", "["):
+        try:
+            return json.dumps(scrub(json.loads(value)))
+        except ValueError:
+            return value
+    return value
+
+
+def _open(path, mode):
+    return gzip.open(path, mode) if path.endswith(".gz") else open(path, mode)
+
+
+def _path(url):
+    parsed = urlparse(url)
+    return parsed.path + ("?" + parsed.query if parsed.query else "")
+
+
+class ReplayError(Exception):
+    pass
+
+
+class RecordingTransport(Transport):
+    """
+    Passes requests to transport and writes them with responses to cassette file.
+    Cookies are never written, sign in only notes that session was given.
+    :param append: add to existing cassette, by default it is overwritten
+    """
+
+    def __init__(self, transport, path, append=False):
+        self.transport = transport
+        self.path = path
+        self.pool_maxsize = transport.pool_maxsize
+        self._file = _open(path, "ab" if append else "wb")
+        self._lock = threading.Lock()
+
+    @property
+    def cookies(self):
+        return self.transport.cookies
+
+    def request(self, method, url, data=None, files=None, **kwargs):
+        start = time.time()
+        response = self.transport.request(method, url, data=data, files=files, **kwargs)
+        elapsed = time.time() - start
+        entry = {
+            "method": method,
+            "path": _path(url),
+            "data": scrub(data),
+            "files": sorted(files) if files else None,
+            "status": response.status_code,
+            "headers": dict((h, response.headers[h]) for h in RECORDED_HEADERS if response.headers.get(h)),
+            "body": scrub(response.text),
+            "elapsed": round(elapsed, 4),
+            "session": "PLAY_SESSION" in self.transport.cookies,
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+        return response
+
+    def stop(self):
+        """Closes cassette file, transport stays open"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def close(self):
+        self.stop()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Serves responses from cassette: requests with the same method and path get recorded responses in recorded order,
+    the last one is repeated when they run out (e.g. for longer status polling). Not recorded request raises ReplayError.
+    :param latency: seconds added to every response
+    :param recorded_latency: also wait as long as recorded request took
+    """
+    cookies = None
+
+    def __init__(self, path, latency=0.0, recorded_latency=False):
+        self.latency = latency
+        self.recorded_latency = recorded_latency
+        self.cookies = {}
+        self.requests = []
+
+        self._served = {}  # (method, path): number of served responses
+        self._entries = {}  # (method, path): [entry]
+        with _open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault((entry["method"], entry["path"]), []).append(entry)
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        key = (method, _path(url))
+        with self._lock:
+            self.requests.append(key)
+            entries = self._entries.get(key)
+            if not entries:
+                raise ReplayError("No recorded response for {0} {1}".format(*key))
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            entry = entries[min(served, len(entries) - 1)]
+            if entry["session"]:
+                self.cookies["PLAY_SESSION"] = "replayed-session"
+
+        delay = self.latency + (entry["elapsed"] if self.recorded_latency else 0)
+        if delay:
+            time.sleep(delay)
+        return FakeResponse(entry["status"], text=entry["body"], headers=entry["headers"])
+
+    def reset_requests(self):
+        with self._lock:
+            requests, self.requests = self.requests, []
+        return requests
@@ -0,0 +1,423 @@
+"""
+In-process fake of Qubell platform, usable as Router transport:
+
+    router = Router("http://fake", transport=FakeQubell())
+
+It implements every route of qubell.api.provider.router.Router over in-memory state.
+Instances change status on each observation (GET of instance or dashboard), so waits are deterministic:
+launch goes Requested -> Launching -> Running, workflow goes Executing -> Running, destroy goes Destroying -> Destroyed.
+"""
+from collections import OrderedDict
+import itertools
+import re
+import threading
+import time
+from urlparse import urlparse
+
+import simplejson as json
+
+from qubell.api.provider.transport import Transport
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+
+class FakeResponse(object):
+    """Minimal requests.Response look-alike"""
+
+    def __init__(self, status_code=200, body=None, text=None, headers=None):
+        self.status_code = status_code
+        if text is None:
+            text = json.dumps(body) if body is not None else ""
+        self.text = self.content = text
+        self.headers = {'Content-Type': 'application/json', 'Content-Length': str(len(text))}
+        self.headers.update(headers or {})
+        self.cookies = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeError(Exception):
+    def __init__(self, status_code, text):
+        Exception.__init__(self, text)
+        self.status_code = status_code
+        self.text = text
+
+
+def _route_regex(compiled):
+    def group(field):
+        if field is None:
+            return ""
+        return "(?P<ctype>\\.json|)" if field == "ctype" else "(?P<{0}>[^/]+?)".format(field)
+    return re.compile("^" + "".join(re.escape(literal) + group(field) for literal, field in compiled.parts) + "$")
+
+
+def _routes():
+    from qubell.api.provider.router import Router
+    routes = []
+    for name in sorted(dir(Router)):
+        compiled = getattr(getattr(Router, name), "route", None)
+        if compiled:
+            routes.append((compiled.method, _route_regex(compiled), name))
+    return routes
+
+
+class FakeQubell(Transport):
+    """
+    Transport, that serves routes from memory.
+    :param users: {email: password} allowed to sign in, any credentials are accepted if not set
+    :param steps: observations needed for instance to pass each transitional status
+    """
+    cookies = None
+
+    def __init__(self, users=None, steps=1):
+        self.users = users
+        self.steps = steps
+        self.cookies = {}
+        self.sessions = set()
+        self.organizations = OrderedDict()
+        self.requests = []
+
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._routes = _routes()
+
+    # Transport
+
+    def request(self, method, url, data=None, files=None, cookies=None, **kwargs):
+        path = urlparse(url).path
+        with self._lock:
+            self.requests.append((method, path))
+            for route_method, regex, name in self._routes:
+                match = route_method == method and regex.match(path)
+                if match:
+                    try:
+                        if name != "post_sign_in" and not self._authorized(cookies):
+                            raise FakeError(401, "Session expired or not signed in")
+                        args = {k: v for k, v in match.groupdict().items() if k != "ctype"}
+                        body = getattr(self, name)(data=self._decode(data), files=files, **args)
+                    except FakeError as e:
+                        return FakeResponse(e.status_code, text=e.text)
+                    return FakeResponse(200, body)
+            return FakeResponse(404, text="No route for {0} {1}".format(method, path))
+
+    def close(self):
+        pass
+
+    # Test helpers
+
+    def expire_sessions(self):
+        """Forgets all issued sessions, next play_auth call gets 401"""
+        with self._lock:
+            self.sessions.clear()
+
+    def reset_requests(self):
+        with self._lock:
+            requests, self.requests = self.requests, []
+        return requests
+
+    # State helpers
+
+    def _id(self):
+        return "{0:024x}".format(next(self._ids))
+
+    @staticmethod
+    def _now():
+        return int(time.time() * 1000)
+
+    @staticmethod
+    def _decode(data):
+        if isinstance(data, basestring):
+            try:
+                return json.loads(data) if data else {}
+            except ValueError:
+                return data
+        return data if data is not None else {}
+
+    def _authorized(self, cookies):
+        return bool(cookies) and cookies.get("PLAY_SESSION") in self.sessions
+
+    @staticmethod
+    def _find(collection, id, kind):
+        if id not in collection:
+            raise FakeError(404, "{0} {1} not found".format(kind, id))
+        return collection[id]
+
+    def _org(self, org_id):
+        return self._find(self.organizations, org_id, "Organization")
+
+    def _app(self, org_id, app_id):
+        return self._find(self._org(org_id)["applications"], app_id, "Application")
+
+    def _env(self, org_id, env_id):
+        return self._find(self._org(org_id)["environments"], env_id, "Environment")
+
+    def _instance(self, org_id, instance_id):
+        return self._find(self._org(org_id)["instances"], instance_id, "Instance")
+
+    def _observe(self, instance):
+        """Moves instance one step to final status of its current workflow"""
+        path = instance["_path"]
+        if not path:
+            return
+        instance["_seen"] += 1
+        if instance["_seen"] >= self.steps:
+            instance["_seen"] = 0
+            instance["status"] = path.pop(0)
+            if not path:
+                instance["startedAt"] = None
+                instance["currentWorkflow"] = None
+
+    def _start_workflow(self, instance, name, path):
+        now = self._now()
+        instance["_path"] = path
+        instance["_seen"] = 0
+        instance["status"] = path.pop(0)
+        instance["startedAt"] = now
+        instance["currentWorkflow"] = {"name": name, "startedAt": now}
+        instance["workflowHistory"].append({"name": name, "startedAt": now})
+
+    @staticmethod
+    def _public(instance):
+        return {k: v for k, v in instance.items() if not k.startswith("_")}
+
+    @staticmethod
+    def _summary(entity, *fields):
+        return {k: entity[k] for k in ("id", "name") + fields if k in entity}
+
+    def _instance_summary(self, instance):
+        return self._summary(instance, "status", "applicationId", "environmentId")
+
+    def _env_json(self, org, env):
+        env = dict(env)
+        env["isDefault"] = org["defaultEnvironment"] == env["id"]
+        env["services"] = [self._public(org["instances"][s]) for s in env["serviceIds"] if s in org["instances"]]
+        return env
+
+    # Routes, named as Router methods
+
+    def post_sign_in(self, data, **kwargs):
+        email, password = data.get("email"), data.get("password")
+        if self.users is None or self.users.get(email) == password:
+            session = "session-" + self._id()
+            self.sessions.add(session)
+            self.cookies["PLAY_SESSION"] = session
+        return {}
+
+    def get_404(self, **kwargs):
+        raise FakeError(404, "Not found")
+
+    def post_organization(self, data, **kwargs):
+        org_id = self._id()
+        zone = {"id": self._id(), "name": "default zone", "isDefault": True}
+        org = {"id": org_id, "name": data["name"], "editable": True, "backends": [zone],
+               "applications": OrderedDict(), "instances": OrderedDict(), "environments": OrderedDict(),
+               "providers": OrderedDict(), "defaultEnvironment": None}
+        self.organizations[org_id] = org
+        env = self.post_organization_environment(org_id, {"name": "default", "backend": zone["id"]})
+        org["defaultEnvironment"] = env["id"]
+        return {"id": org_id, "name": org["name"]}
+
+    def get_organizations(self, **kwargs):
+        return [self._summary(org, "editable", "backends", "defaultEnvironment") for org in self.organizations.values()]
+
+    def get_organization(self, org_id, **kwargs):
+        return self._summary(self._org(org_id), "editable", "backends", "defaultEnvironment")
+
+    def put_organization_default_environment(self, org_id, data, **kwargs):
+        org = self._org(org_id)
+        org["defaultEnvironment"] = self._env(org_id, data.get("environmentId", kwargs.get("env_id")))["id"]
+        return self._env_json(org, org["environments"][org["defaultEnvironment"]])
+
+    # applications
+
+    def post_organization_application(self, org_id, data, files=None, **kwargs):
+        org = self._org(org_id)
+        app_id = self._id()
+        manifest = (files or {}).get("path", "")
+        org["applications"][app_id] = {"id": app_id, "name": data.get("name", "application"), "manifest": manifest,
+                                       "manifestVersion": 1, "revisions": OrderedDict()}
+        return {"id": app_id}
+
+    def get_applications(self, org_id, **kwargs):
+        return [self._summary(app) for app in self._org(org_id)["applications"].values()]
+
+    def get_application(self, org_id, app_id, **kwargs):
+        org = self._org(org_id)
+        app = self._app(org_id, app_id)
+        return {"id": app["id"], "name": app["name"], "manifestVersion": app["manifestVersion"],
+                "revisions": [self._summary(rev) for rev in app["revisions"].values()],
+                "instances": [self._instance_summary(ins) for ins in org["instances"].values()
+                              if ins["applicationId"] == app_id]}
+
+    def put_application(self, org_id, app_id, data, **kwargs):
+        app = self._app(org_id, app_id)
+        app.update({k: v for k, v in data.items() if k in ("name",)})
+        return self.get_application(org_id, app_id)
+
+    def delete_application(self, org_id, app_id, **kwargs):
+        self._app(org_id, app_id)
+        del self._org(org_id)["applications"][app_id]
+        return {}
+
+    def post_application_refresh(self, org_id, app_id, **kwargs):
+        app = self._app(org_id, app_id)
+        return {"manifestVersion": app["manifestVersion"], "manifest": app["manifest"]}
+
+    def post_application_manifest(self, org_id, app_id, data, files=None, **kwargs):
+        app = self._app(org_id, app_id)
+        app["manifest"] = (files or {}).get("path", "")
+        app["manifestVersion"] += 1
+        return {"manifestVersion": app["manifestVersion"]}
+
+    # revisions
+
+    def post_revision(self, org_id, app_id, data, **kwargs):
+        app = self._app(org_id, app_id)
+        rev_id = self._id()
+        app["revisions"][rev_id] = dict(data, id=rev_id)
+        return {"id": rev_id}
+
+    def get_revision(self, org_id, app_id, rev_id, **kwargs):
+        return self._find(self._app(org_id, app_id)["revisions"], rev_id, "Revision")
+
+    def delete_revision(self, org_id, app_id, rev_id, **kwargs):
+        self.get_revision(org_id, app_id, rev_id)
+        del self._app(org_id, app_id)["revisions"][rev_id]
+        return {}
+
+    # instances
+
+    def post_organization_instance(self, org_id, app_id, data, **kwargs):
+        org = self._org(org_id)
+        app = self._app(org_id, app_id)
+        instance_id = self._id()
+        parameters = dict(data)
+        environment_id = parameters.pop("environmentId", None) or org["defaultEnvironment"]
+        name = parameters.pop("instanceName", app["name"])
+        instance = {"id": instance_id, "name": name, "applicationId": app_id, "applicationName": app["name"],
+                    "environmentId": environment_id, "revision": {"parameters": parameters.get("parameters", {})},
+                    "returnValues": [], "errorMessage": None, "submodules": [], "environments": [],
+                    "workflowHistory": [], "_path": [], "_seen": 0}
+        org["instances"][instance_id] = instance
+        self._start_workflow(instance, "launch", ["Requested", "Launching", "Running"])
+        return {"id": instance_id}
+
+    def get_instances(self, org_id, **kwargs):
+        instances = self._org(org_id)["instances"].values()
+        for instance in instances:
+            self._observe(instance)
+        return [self._instance_summary(ins) for ins in instances]
+
+    def get_instance(self, org_id, instance_id, **kwargs):
+        instance = self._instance(org_id, instance_id)
+        self._observe(instance)
+        return self._public(instance)
+
+    def post_instance_workflow(self, org_id, instance_id, wf_name, **kwargs):
+        instance = self._instance(org_id, instance_id)
+        if wf_name == "destroy":
+            self._start_workflow(instance, wf_name, ["Destroying", "Destroyed"])
+        else:
+            self._start_workflow(instance, wf_name, ["Executing", "Running"])
+        return {}
+
+    def put_instance_configuration(self, org_id, instance_id, data, **kwargs):
+        instance = self._instance(org_id, instance_id)
+        if "instanceName" in data:
+            instance["name"] = data["instanceName"]
+        if "parameters" in data:
+            instance["revision"] = {"parameters": data["parameters"]}
+            self._start_workflow(instance, "reconfigure", ["Executing", "Running"])
+        return self._public(instance)
+
+    def post_instance_services(self, org_id, instance_id, data, **kwargs):
+        org = self._org(org_id)
+        instance = self._instance(org_id, instance_id)
+        for env_id in data:
+            env = self._env(org_id, env_id)
+            if instance_id not in env["serviceIds"]:
+                env["serviceIds"].append(instance_id)
+        instance["environments"] = [self._summary(org["environments"][e]) for e in data]
+        return {}
+
+    # environments
+
+    def get_environments(self, org_id, **kwargs):
+        org = self._org(org_id)
+        return [self._summary(self._env_json(org, env), "isDefault", "backend") for env in org["environments"].values()]
+
+    def post_organization_environment(self, org_id, data, **kwargs):
+        org = self._org(org_id)
+        env_id = self._id()
+        org["environments"][env_id] = {"id": env_id, "name": data.get("name"),
+                                       "backend": data.get("backend") or org["backends"][0]["id"],
+                                       "serviceIds": [], "markers": [], "properties": [], "policies": [],
+                                       "providerId": None}
+        if data.get("isDefault"):
+            org["defaultEnvironment"] = env_id
+        return {"id": env_id}
+
+    def get_environment(self, org_id, env_id, **kwargs):
+        return self._env_json(self._org(org_id), self._env(org_id, env_id))
+
+    def get_environment_available_services(self, org_id, env_id, **kwargs):
+        self._env(org_id, env_id)
+        return self.get_services(org_id)
+
+    def put_environment(self, org_id, env_id, data, **kwargs):
+        env = self._env(org_id, env_id)
+        for key in ("name", "serviceIds", "markers", "properties", "policies", "providerId"):
+            if key in data:
+                env[key] = data[key]
+        if data.get("isDefault"):
+            self._org(org_id)["defaultEnvironment"] = env_id
+        return self.get_environment(org_id, env_id)
+
+    def delete_environment(self, org_id, env_id, **kwargs):
+        self._env(org_id, env_id)
+        del self._org(org_id)["environments"][env_id]
+        return {}
+
+    # zones
+
+    def get_zones(self, org_id, **kwargs):
+        return list(self._org(org_id)["backends"])
+
+    # cloud providers
+
+    def get_providers(self, org_id, **kwargs):
+        return list(self._org(org_id)["providers"].values())
+
+    def post_provider(self, org_id, data, **kwargs):
+        org = self._org(org_id)
+        prov_id = self._id()
+        org["providers"][prov_id] = dict(data, id=prov_id)
+        return {"id": prov_id}
+
+    def delete_provider(self, org_id, prov_id, **kwargs):
+        org = self._org(org_id)
+        self._find(org["providers"], prov_id, "Provider")
+        del org["providers"][prov_id]
+        return {}
+
+    # services
+
+    def get_services(self, org_id, **kwargs):
+        org = self._org(org_id)
+        service_ids = set(s for env in org["environments"].values() for s in env["serviceIds"])
+        return [self._instance_summary(ins) for ins in org["instances"].values() if ins["id"] in service_ids]
+
+    def post_service_generate(self, org_id, instance_id, **kwargs):
+        self._instance(org_id, instance_id)
+        return {"id": self._id()}
@@ -0,0 +1,60 @@
+"""
+Single-flight: coalescing of identical calls that are in flight at the same time.
+"""
+import sys
+import threading
+import time
+
+from qubell.api.private.exceptions import ApiTimeoutError
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time.
+    Callers of the same key, that arrive while it is running, wait for it and share its result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, deadline=None):
+        """
+        :param deadline: absolute time, after which waiting for call of another thread raises ApiTimeoutError
+        :return: tuple (result, shared), shared is True if result was taken from call of another thread
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(None if deadline is None else max(0, deadline - time.time())):
+                raise ApiTimeoutError("Deadline exceeded while waiting for the same call in flight")
+            if call.exc_info:
+                raise call.exc_info[0], call.exc_info[1], call.exc_info[2]
+            return call.result, True
+
+        try:
+            call.result = func()
+        except:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
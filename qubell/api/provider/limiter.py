@@ -0,0 +1,144 @@
+"""
+Client side governor of calls to tenant: token bucket rate limiter and adaptive (AIMD) concurrency limit.
+Governors are shared per tenant base url, so all routers of one tenant are governed together.
+"""
+import threading
+import time
+
+from qubell.api.private.exceptions import ApiTimeoutError
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+OVERLOAD_CODES = (429, 503)
+
+
+class TokenBucket(object):
+    """
+    Allows 'rate' calls per second on average and bursts up to 'burst' calls.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Takes token, sleeps until it is available. Returns seconds waited"""
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0
+            if deadline is not None and now + wait > deadline:
+                raise ApiTimeoutError("Deadline is too close to wait {0:.3f} s for rate limit".format(wait))
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class ConcurrencyLimit(object):
+    """
+    Limit of calls in flight, adjusted by additive-increase/multiplicative-decrease:
+    each healthy call adds increase/limit (about +increase per round of calls),
+    overloaded call (429/503, latency above latency_ratio times usual, or failed one: timeout, connection error)
+    multiplies limit by decrease.
+    """
+
+    def __init__(self, initial=10, minimum=1, maximum=100, increase=1.0, decrease=0.5, latency_ratio=3.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_ratio = latency_ratio
+
+        self.in_flight = 0
+        self.latency = None  # moving average of healthy calls, ms
+        self._condition = threading.Condition()
+
+    def acquire(self, deadline=None):
+        """Waits for free slot, but not after deadline (absolute time). Returns seconds waited, 0 if slot was free"""
+        start = None
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                if start is None:
+                    start = time.time()
+                if deadline is None:
+                    self._condition.wait()
+                    continue
+                left = deadline - time.time()
+                if left <= 0:
+                    raise ApiTimeoutError("Deadline exceeded while waiting for free slot of concurrency limit")
+                self._condition.wait(left)
+            self.in_flight += 1
+        return time.time() - start if start is not None else 0
+
+    def release(self, status=None, latency=None, failed=False):
+        """Frees slot of call, that got response with status in latency ms, or failed without response"""
+        with self._condition:
+            self.in_flight -= 1
+            if failed or self._overloaded(status, latency):
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            else:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+                if latency is not None:
+                    self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+            self._condition.notify_all()
+
+    def _overloaded(self, status, latency):
+        if status in OVERLOAD_CODES:
+            return True
+        return bool(latency and self.latency and self.latency_ratio and latency > self.latency * self.latency_ratio)
+
+
+class Governor(object):
+    """
+    Rate and concurrency governor of one tenant. Both parts are optional:
+    :param rate: calls per second, None for no rate limit
+    :param burst: calls allowed at once above rate
+    :param concurrency: initial limit of calls in flight, None for no concurrency limit
+    """
+
+    def __init__(self):
+        self.bucket = None
+        self.concurrency = None
+
+    def configure(self, rate=None, burst=None, concurrency=None, min_concurrency=1, max_concurrency=100,
+                  latency_ratio=3.0):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = ConcurrencyLimit(concurrency, min_concurrency, max_concurrency,
+                                            latency_ratio=latency_ratio) if concurrency else None
+        return self
+
+    def acquire(self, deadline=None):
+        """
+        Returns seconds waited for permission to call and concurrency limit the slot was taken from (or None),
+        call releases slot to that limit even if governor is reconfigured meanwhile.
+        Raises ApiTimeoutError if permission is not given by deadline.
+        """
+        bucket, concurrency = self.bucket, self.concurrency
+        waited = 0
+        if bucket:
+            waited += bucket.acquire(deadline)
+        if concurrency:
+            waited += concurrency.acquire(deadline)
+        return waited, concurrency
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def governor_for(base_url):
+    """Returns governor shared by all routers of tenant"""
+    with _governors_lock:
+        governor = _governors.get(base_url)
+        if governor is None:
+            governor = _governors[base_url] = Governor()
+        return governor
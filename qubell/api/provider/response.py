@@ -0,0 +1,63 @@
+"""
+Response of route: body is read at once, so connection goes back to pool, json is decoded once per response.
+Streamed responses are read by consumer instead, e.g. item by item with iter_json.
+"""
+import simplejson as json
+
+from qubell.api.provider.stream import iter_json_array
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+_NOT_DECODED = object()
+
+
+class ApiResponse(object):
+    """
+    Wraps requests.Response like object of transport, other attributes are taken from it.
+    json() decodes body on first call (simplejson, with C speedups when built), later calls return the same object,
+    so copy() it before handing out to another consumer, that may change decoded data.
+    """
+
+    def __init__(self, raw, stream=False):
+        self.raw = raw
+        self.status_code = raw.status_code
+        self.headers = raw.headers
+        self.streamed = stream
+        if not stream:
+            self.content = raw.content
+        self._text = None
+        self._json = _NOT_DECODED
+
+    def copy(self):
+        """Returns response sharing body, but not decoded json"""
+        return ApiResponse(self.raw, self.streamed)
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.raw.text
+        return self._text
+
+    def json(self, **kwargs):
+        if kwargs:
+            return json.loads(self.content, **kwargs)
+        if self._json is _NOT_DECODED:
+            self._json = json.loads(self.content)
+        return self._json
+
+    def iter_json(self, chunk_size=64 * 1024):
+        """Yields items of json array body one at a time, while it is received. Connection is released at the end"""
+        try:
+            for item in iter_json_array(self.raw.iter_content(chunk_size)):
+                yield item
+        finally:
+            self.raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __repr__(self):
+        return "<ApiResponse [{0}]>".format(self.status_code)
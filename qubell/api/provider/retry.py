@@ -0,0 +1,97 @@
+"""
+Retry policy of idempotent routes: decorrelated jitter backoff, per call deadline and process wide retry budget.
+"""
+import random
+import threading
+import time
+
+from qubell.api.private.exceptions import ApiTimeoutError
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+RETRY_CODES = (500, 502, 503, 504)
+
+
+class RetryBudget(object):
+    """
+    Limits retries to a share of calls, so they can not pile onto struggling tenant:
+    every call deposits 'ratio' of token, every retry withdraws whole one, at most 'reserve' tokens are saved.
+    """
+
+    def __init__(self, ratio=0.1, reserve=10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self):
+        return self._tokens
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy(object):
+    """
+    :param attempts: max number of requests per call, first one included
+    :param base: min delay between attempts, seconds
+    :param cap: max delay between attempts, seconds
+    :param deadline: seconds since call start, after which no more retries are done, None for no deadline
+    :param codes: http codes, that are retried
+    :param budget: RetryBudget to draw retries from
+    """
+
+    def __init__(self, attempts=3, base=0.1, cap=5.0, deadline=30.0, codes=RETRY_CODES, budget=RETRY_BUDGET):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.deadline = deadline
+        self.codes = codes
+        self.budget = budget
+
+    def retry_status(self, status_code):
+        return status_code in self.codes
+
+    def retry_error(self, error):
+        from requests.exceptions import ConnectionError
+        return isinstance(error, (ConnectionError, ApiTimeoutError))
+
+    def schedule(self, deadline=None):
+        """
+        Starts call: returns iterator of delays before its retries (decorrelated jitter),
+        it stops when attempts, deadline or retry budget are exhausted.
+        :param deadline: absolute time, overrides policy deadline, if earlier
+        """
+        self.budget.deposit()
+        if self.deadline is not None:
+            own = time.time() + self.deadline
+            deadline = own if deadline is None else min(deadline, own)
+        return self._delays(deadline)
+
+    def _delays(self, deadline):
+        delay = self.base
+        for _ in range(self.attempts - 1):
+            delay = min(self.cap, random.uniform(self.base, delay * 3))
+            if deadline is not None and time.time() + delay > deadline:
+                return
+            if not self.budget.withdraw():
+                return
+            yield delay
+
+
+DEFAULT_RETRY = RetryPolicy()
@@ -1,39 +1,312 @@
+from contextlib import contextmanager
+import logging as log
 import os
+import threading
+import time
 
-import requests
-from requests.auth import HTTPBasicAuth
-
-from qubell.api.private.exceptions import ApiUnauthorizedError
+from qubell.api.private.exceptions import ApiUnauthorizedError, ApiTimeoutError
 from qubell.api.provider import route, play_auth
+from qubell.api.provider.batch import Batch
+from qubell.api.provider.breaker import breakers_for
+from qubell.api.provider.cache import ResponseCache, ValidatorCache
+from qubell.api.provider.flight import SingleFlight
+from qubell.api.provider.limiter import governor_for
+from qubell.api.provider.session import SessionStore
+from qubell.api.provider.transport import SessionTransport
+
+
+def _basic_auth(email, password):
+    from requests.auth import HTTPBasicAuth
+    return HTTPBasicAuth(email, password)
 
 
 class Router(object):
-    def __init__(self, base_url, verify_ssl=False, verify_codes=True):
+    """
+    Holds connection to tenant and transport, that all routes use.
+    By default transport is pooled keep-alive session (see SessionTransport for pool parameters).
+    :param cache_ttl: seconds to keep GET responses in cache, None to disable cache
+    :param cache_size: max number of cached responses
+    :param coalesce: identical GET requests issued concurrently wait for the one in flight instead of being sent
+    :param revalidate: repeated GET requests are conditional (ETag/Last-Modified), 304 is served from last response
+    :param connect_timeout: seconds to establish connection, None to wait forever
+    :param read_timeout: seconds to wait for response data, None to wait forever
+    :param session_store: SessionStore to reuse sessions of previous runs, instead of signing in
+    """
+    def __init__(self, base_url, verify_ssl=False, verify_codes=True, pool_connections=10, pool_maxsize=10,
+                 keep_alive=None, transport=None, cache_ttl=None, cache_size=256, coalesce=True, revalidate=False,
+                 connect_timeout=10, read_timeout=120, session_store=None):
         self.base_url = base_url
         self.verify_ssl = verify_ssl
         self.verify_codes = verify_codes
 
+        self.transport = transport or SessionTransport(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                                       keep_alive=keep_alive)
+
+        self.cache = ResponseCache(cache_ttl, cache_size) if cache_ttl else None
+        self.flights = SingleFlight() if coalesce else None
+        self.validators = ValidatorCache(cache_size) if revalidate else None
+        self.limited = False
+        self.writes = 0  # number of sent POST/PUT/DELETE calls
+        self.protected = False
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._deadlines = threading.local()
+        self._scoped_caches = threading.local()
+
+        self.session_store = session_store
+
         self._cookies = None
         self._auth = None
+        self._credentials = None
+        self._sessions = 0  # number of sign ins, to tell expired session from renewed one
+        self._sign_in_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._async_router = None
+
+    def close(self):
+        """Closes transport connections and thread pool of async_router"""
+        with self._lock:
+            async_router, self._async_router = self._async_router, None
+        if async_router is not None:
+            async_router.close()
+        self.transport.close()
+
+    @property
+    def cache(self):
+        """ResponseCache used by calls of this thread: one of innermost cached block, else one of router"""
+        stack = getattr(self._scoped_caches, "stack", None)
+        return stack[-1] if stack else self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        self._cache = cache
+
+    def enable_cache(self, ttl=1.0, max_size=256):
+        """Caches GET responses for ttl seconds, POST/PUT/DELETE evict cached ones of the same organization"""
+        self.cache = ResponseCache(ttl, max_size)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    @contextmanager
+    def cached(self, ttl=1.0, max_size=256):
+        """
+        Caches GET responses of calls made by this thread within block, cache of router is not changed:
+            with router.cached(ttl=5):
+                ...
+        """
+        stack = self._scoped_caches.__dict__.setdefault("stack", [])
+        cache = ResponseCache(ttl, max_size)
+        stack.append(cache)
+        try:
+            yield cache
+        finally:
+            stack.pop()
+
+    def enable_revalidation(self, max_size=256):
+        """
+        Keeps last GET responses, that have ETag or Last-Modified, and sends repeated requests with
+        If-None-Match/If-Modified-Since, so unchanged body is not sent again: 304 is served from kept response.
+        """
+        self.validators = ValidatorCache(max_size)
+        return self.validators
+
+    def disable_revalidation(self):
+        self.validators = None
+
+    def limit(self, rate=None, burst=None, concurrency=None, min_concurrency=1, max_concurrency=100,
+              latency_ratio=3.0):
+        """
+        Governs calls to tenant of this router, governor is shared by all routers of the same base_url.
+        :param rate: calls per second (token bucket), None for no rate limit
+        :param burst: calls allowed at once above rate
+        :param concurrency: initial limit of calls in flight, it backs off on 429/503 or latency above
+                            latency_ratio times usual, and ramps up while tenant is healthy. None for no limit
+        """
+        governor_for(self.base_url).configure(rate=rate, burst=burst, concurrency=concurrency,
+                                              min_concurrency=min_concurrency, max_concurrency=max_concurrency,
+                                              latency_ratio=latency_ratio)
+        self.limited = True
+
+    def unlimit(self):
+        self.limited = False
+
+    @property
+    def governor(self):
+        return governor_for(self.base_url) if self.limited else None
+
+    def enable_breaker(self, error_ratio=0.5, min_calls=10, window=20, reset_timeout=30.0, trial_calls=1):
+        """
+        Guards every route of tenant by circuit breaker, breakers are shared by all routers of the same base_url.
+        Route breaker opens when error_ratio of last window calls failed (connection error, timeout, 429 or 5xx),
+        then its calls raise CircuitOpenError for reset_timeout seconds, until trial_calls succeed.
+        """
+        breakers_for(self.base_url).configure(error_ratio=error_ratio, min_calls=min_calls, window=window,
+                                              reset_timeout=reset_timeout, trial_calls=trial_calls)
+        self.protected = True
+
+    def disable_breaker(self):
+        self.protected = False
+
+    @property
+    def breakers(self):
+        return breakers_for(self.base_url) if self.protected else None
+
+    @contextmanager
+    def deadline(self, seconds):
+        """
+        Limits time of all calls made by this thread within block, nested entity operations included:
+            with router.deadline(60):
+                organization.restore(config)
+        Each request gets only time that remains, ApiTimeoutError is raised when it runs out.
+        Nested deadlines can only shorten outer ones.
+        """
+        with self.deadline_at(time.time() + seconds):
+            yield
+
+    @contextmanager
+    def deadline_at(self, at):
+        """Same as deadline, but takes absolute time, None means no deadline"""
+        stack = self._deadlines.__dict__.setdefault("stack", [])
+        current = stack[-1] if stack else None
+        stack.append(at if current is None else min(filter(None, [at, current])))
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    @property
+    def current_deadline(self):
+        """Absolute deadline of this thread or None"""
+        stack = getattr(self._deadlines, "stack", None)
+        return stack[-1] if stack else None
+
+    def request_timeout(self, route_timeout=None):
+        """
+        Returns (connect, read) timeout for request, limited by remaining time of deadline.
+        Raises ApiTimeoutError, if deadline passed.
+        """
+        connect, read = route_timeout or (self.connect_timeout, self.read_timeout)
+        deadline = self.current_deadline
+        if deadline is not None:
+            left = deadline - time.time()
+            if left <= 0:
+                raise ApiTimeoutError("Deadline exceeded by {0:.3f} s".format(-left))
+            connect = left if connect is None else min(connect, left)
+            read = left if read is None else min(read, left)
+        if connect is None and read is None:
+            return None
+        return connect, read
+
+    @contextmanager
+    def record(self, path, append=False):
+        """
+        Writes requests and responses within block to cassette file, see qubell.api.provider.cassette
+        :param append: add to existing cassette instead of overwriting it
+        """
+        from qubell.api.provider.cassette import RecordingTransport
+
+        recorder = self.transport = RecordingTransport(self.transport, path, append)
+        try:
+            yield recorder
+        finally:
+            self.transport = recorder.transport
+            recorder.stop()
+
+    def batch(self, max_workers=10):
+        """Returns Batch, that runs many calls concurrently, see Batch"""
+        return Batch(self, max_workers)
+
+    @property
+    def async_router(self):
+        """AsyncRouter over this router, created on first use"""
+        with self._lock:
+            if self._async_router is None:
+                self._async_router = AsyncRouter(self)
+            return self._async_router
 
     @property
     def is_connected(self):
         return self._cookies and 'PLAY_SESSION' in self._cookies
 
-    #todo: add integration test for this
     def connect(self, email, password):
+        """
+        Signs in. If router has session store, session stored for tenant and user is reused without request,
+        it is checked by first call: if expired, router signs in again.
+        """
+        stored = self.session_store and self.session_store.load(self.base_url, email)
+        if stored:
+            self._forget_user()
+            self.transport.cookies['PLAY_SESSION'] = stored
+            self._cookies = self.transport.cookies
+            self._sessions += 1
+            self._auth = _basic_auth(email, password)
+            self._credentials = (email, password)
+            return
+        self.sign_in(email, password)
+
+    def _forget_user(self):
+        if self.cache is not None:
+            self.cache.clear()  # responses of previous user
+        if self.validators is not None:
+            self.validators.clear()
+        self.transport.cookies.clear()  # forget previous sign in
+
+    #todo: add integration test for this
+    def sign_in(self, email, password):
+        """Signs in with request to tenant, session is saved to session store, if any"""
         url = self.base_url + '/signIn'
         data = {
             'email': email,
             'password': password}
-        with requests.session() as session:
-            session.post(url=url, data=data, verify=self.verify_ssl)
-            self._cookies = session.cookies
+        timeout = self.request_timeout()
+        previous = dict(self.transport.cookies)  # kept, if sign in fails
+        self._forget_user()
+        try:
+            try:
+                self.transport.request('POST', url, data=data, verify=self.verify_ssl, timeout=timeout)
+            except Exception as e:
+                from requests.exceptions import Timeout  # loaded by transport already
+                if isinstance(e, Timeout):
+                    raise ApiTimeoutError("Sign in to {0} timed out: {1}".format(self.base_url, e))
+                raise
+            if 'PLAY_SESSION' not in self.transport.cookies:
+                raise ApiUnauthorizedError("Authentication failed, please check settings")
+        except Exception:
+            self.transport.cookies.clear()
+            self.transport.cookies.update(previous)
+            raise
+        self._cookies = self.transport.cookies
+        self._sessions += 1
+
+        self._auth = _basic_auth(email, password)
+        self._credentials = (email, password)
+        if self.session_store:
+            try:
+                self.session_store.save(self.base_url, email, self._cookies.get('PLAY_SESSION'))
+            except (IOError, OSError) as e:
+                log.warning("Session is not saved to {0}: {1}".format(self.session_store.path, e))
 
-        if not self.is_connected:
-            raise ApiUnauthorizedError("Authentication failed, please check settings")
-
-        self._auth = HTTPBasicAuth(email, password)
+    @property
+    def session(self):
+        """Identifies current sign in, changes when router signs in again"""
+        return self._sessions
+
+    def reconnect(self, expired_session):
+        """
+        Signs in again with credentials of last connect, if session is still the expired one.
+        Concurrent callers, that got expired session, wait for single sign in and reuse it.
+        Returns False, if router was never connected.
+        """
+        if self._credentials is None:
+            return False
+        with self._sign_in_lock:
+            if self._sessions == expired_session:
+                log.info("Session expired, signing in again to {0}".format(self.base_url))
+                self.sign_in(*self._credentials)
+        return True
 
     @route("POST /signIn")
     def post_sign_in(self, body): pass
@@ -59,7 +332,7 @@ class Router(object):
     def post_organization_application(self, org_id, data, files, cookies, ctype=".json"): pass
 
     @play_auth
-    @route("PUT /organizations/{org_id}/defaultEnvironment{ctype}")
+    @route("PUT /organizations/{org_id}/defaultEnvironment{ctype}", idempotent=True)
     def put_organization_default_environment(self, org_id, env_id, data, cookies, ctype=".json"): pass
 
     @play_auth
@@ -76,7 +349,7 @@ class Router(object):
     def get_applications(self, org_id, cookies, data="{}", ctype=".json"): pass
 
     @play_auth
-    @route("PUT /organizations/{org_id}/applications/{app_id}{ctype}")
+    @route("PUT /organizations/{org_id}/applications/{app_id}{ctype}", idempotent=True)
     def put_application(self, org_id, app_id, data, cookies, ctype=".json"): pass
 
     @play_auth
@@ -111,7 +384,7 @@ class Router(object):
     #Instance
     @play_auth
     @route("GET /organizations/{org_id}/dashboard{ctype}")
-    def get_instances(self, org_id, cookies, ctype=".json"): pass
+    def get_instances(self, org_id, cookies, ctype=".json", stream=False): pass
 
     @play_auth
     @route("GET /organizations/{org_id}/instances/{instance_id}{ctype}")
@@ -143,7 +416,7 @@ class Router(object):
     def get_environment_available_services(self, org_id, env_id, cookies, ctype=".json"): pass
 
     @play_auth
-    @route("PUT /organizations/{org_id}/environments/{env_id}{ctype}")
+    @route("PUT /organizations/{org_id}/environments/{env_id}{ctype}", idempotent=True)
     def put_environment(self, org_id, env_id, data, cookies, ctype=".json"): pass
 
     @play_auth
@@ -178,4 +451,75 @@ class Router(object):
     def post_service_generate(self, org_id, instance_id, cookies, data="{}", ctype=".json"): pass
 
 
-ROUTER = Router(os.environ.get('QUBELL_TENANT'))
\ No newline at end of file
+class AsyncRouter(object):
+    """
+    Runs calls of wrapped router in a thread pool, so many of them can be in flight at once.
+    Every route of the router is available here with the same parameters (play_auth, basic_auth included),
+    but returns multiprocessing.pool.AsyncResult instead of response, use .get() to wait for it.
+    Note: python 2 has no asyncio, so concurrency is given by threads over pooled router session.
+    Long waits (e.g. instance status) run in separate pool of wait_workers threads, so calls never queue behind them.
+    """
+
+    def __init__(self, router, max_workers=None, wait_workers=100):
+        self.router = router
+        self.max_workers = max_workers or router.transport.pool_maxsize
+        self.wait_workers = wait_workers
+        self._pool = None
+        self._wait_pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                from multiprocessing.pool import ThreadPool
+                self._pool = ThreadPool(self.max_workers)
+            return self._pool
+
+    @property
+    def wait_pool(self):
+        with self._pool_lock:
+            if self._wait_pool is None:
+                from multiprocessing.pool import ThreadPool
+                self._wait_pool = ThreadPool(self.wait_workers)
+            return self._wait_pool
+
+    def submit(self, func, *args, **kwargs):
+        """Runs any callable in pool, returns AsyncResult. Deadline of router in calling thread applies to it"""
+        return self.pool.apply_async(self._call, (self.router.current_deadline, func, args, kwargs))
+
+    def submit_wait(self, func, *args, **kwargs):
+        """Same as submit, but for long waits, that mostly sleep between short calls"""
+        return self.wait_pool.apply_async(self._call, (self.router.current_deadline, func, args, kwargs))
+
+    def _call(self, deadline, func, args, kwargs):
+        with self.router.deadline_at(deadline):
+            return func(*args, **kwargs)
+
+    def close(self):
+        """Stops pool threads, once submitted calls are done"""
+        with self._pool_lock:
+            pools = [pool for pool in (self._pool, self._wait_pool) if pool is not None]
+            self._pool = self._wait_pool = None
+        for pool in pools:
+            pool.close()
+        for pool in pools:
+            pool.join()
+
+    def __getattr__(self, name):
+        method = getattr(self.router, name)
+        if not hasattr(method, "route"):
+            raise AttributeError("'{0}' is not a route of {1}".format(name, self.router.__class__.__name__))
+
+        def async_route(**kwargs):
+            return self.submit(method, **kwargs)
+        async_route.__name__ = name
+        async_route.route = method.route
+
+        self.__dict__[name] = async_route  # generate once per route
+        return async_route
+
+
+ROUTER = Router(os.environ.get('QUBELL_TENANT'),
+                session_store=SessionStore(os.environ['QUBELL_SESSION_STORE']) if os.environ.get('QUBELL_SESSION_STORE')
+                else None)
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+On-disk store of signed in sessions, so short scripts reuse session instead of signing in on each start.
+"""
+import logging as log
+import os
+import stat
+import tempfile
+import threading
+
+import simplejson as json
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".qubell", "sessions.json")
+
+
+class SessionStore(object):
+    """
+    Keeps PLAY_SESSION cookie per tenant and user in json file, readable only by owner (0600).
+    File, that others can read or write, is ignored. Stored session is not checked on load,
+    router signs in again if it is expired.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(tenant, user):
+        return u"{0} {1}".format(user, tenant)
+
+    def _read(self):
+        try:
+            mode = os.stat(self.path).st_mode
+        except OSError:
+            return {}
+        if mode & (stat.S_IRWXG | stat.S_IRWXO):
+            log.warning("Session store {0} is accessible by others, ignored".format(self.path))
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, ValueError) as e:
+            log.warning("Session store {0} is not readable, ignored: {1}".format(self.path, e))
+            return {}
+
+    def _write(self, sessions):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0700)
+        fd, tmp = tempfile.mkstemp(dir=directory or ".", prefix=".sessions")  # created with 0600
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(sessions, f)
+            os.rename(tmp, self.path)
+        except:
+            os.remove(tmp)
+            raise
+
+    def load(self, tenant, user):
+        """Returns stored session cookie or None"""
+        with self._lock:
+            return self._read().get(self._key(tenant, user))
+
+    def save(self, tenant, user, session):
+        with self._lock:
+            sessions = self._read()
+            sessions[self._key(tenant, user)] = session
+            self._write(sessions)
+
+    def forget(self, tenant, user):
+        with self._lock:
+            sessions = self._read()
+            if sessions.pop(self._key(tenant, user), None) is not None:
+                self._write(sessions)
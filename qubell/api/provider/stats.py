@@ -0,0 +1,201 @@
+"""
+Thread safe registry of route statistics: latency histograms, status and error counters, transferred bytes.
+"""
+from bisect import bisect_left
+import threading
+
+import simplejson as json
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+
+def _log_buckets(lowest=1.0, highest=3600000.0, growth=1.1):
+    bounds = []
+    bound = lowest
+    while bound < highest:
+        bounds.append(round(bound, 2))
+        bound *= growth
+    bounds.append(highest)
+    return bounds
+
+# upper bounds in ms, 10% relative error, ~160 buckets from 1 ms to an hour
+LATENCY_BUCKETS = _log_buckets()
+
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+BREAKER_GAUGE = {"closed": 0, "half_open": 0.5, "open": 1}
+
+
+class Histogram(object):
+    """
+    Latency histogram over fixed log scale buckets, memory does not grow with number of samples.
+    Percentiles are reported as upper bound of the bucket, limited by observed max.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+
+    def add(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+
+    def percentile(self, q, maximum):
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return maximum
+                return min(self.buckets[index], maximum)
+        return maximum
+
+
+class RouteStat(object):
+    def __init__(self):
+        self.count = 0
+        self.min = None
+        self.max = 0
+        self.total = 0.0
+        self.histogram = Histogram()
+        self.statuses = {}
+        self.errors = {}
+        self.counters = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.breakers = {}
+
+    def add(self, elapsed, status=None, error=None, sent=0, received=0):
+        self.count += 1
+        self.min = elapsed if self.min is None else min(elapsed, self.min)
+        self.max = max(elapsed, self.max)
+        self.total += elapsed
+        self.histogram.add(elapsed)
+        if status is not None:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+    def snapshot(self):
+        stat = {
+            "count": self.count,
+            "min": self.min or 0,
+            "max": self.max,
+            "avg": self.total / self.count if self.count else 0,
+            "sum": self.total,
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "counters": dict(self.counters),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "breakers": dict(self.breakers),
+        }
+        for name, q in PERCENTILES:
+            stat[name] = self.histogram.percentile(q, self.max)
+        return stat
+
+
+def _label(value):
+    return unicode(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RouteMetrics(object):
+    """
+    Statistic of calls per route string, safe to update from many threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def _stat(self, route_str):
+        stat = self._routes.get(route_str)
+        if stat is None:
+            stat = self._routes[route_str] = RouteStat()
+        return stat
+
+    def record(self, route_str, elapsed, status=None, error=None, sent=0, received=0):
+        """
+        :param elapsed: call time, ms
+        :param status: http status code of response
+        :param error: name of exception class raised by call
+        :param sent: request body bytes
+        :param received: response body bytes
+        """
+        with self._lock:
+            self._stat(route_str).add(elapsed, status, error, sent, received)
+
+    def increment(self, route_str, counter, value=1):
+        """Increments named counter of route, for events that are not calls"""
+        with self._lock:
+            counters = self._stat(route_str).counters
+            counters[counter] = counters.get(counter, 0) + value
+
+    def breaker_state(self, route_str, tenant, state):
+        """Keeps current state of circuit breaker of route on tenant"""
+        with self._lock:
+            self._stat(route_str).breakers[tenant] = state
+
+    def snapshot(self):
+        """Returns copy of statistic: {route: {count, min, max, avg, p50, p90, p99, p999, statuses, errors, ...}}"""
+        with self._lock:
+            return {route_str: stat.snapshot() for route_str, stat in self._routes.items()}
+
+    def reset(self):
+        """Drops collected statistic, returns snapshot taken before reset"""
+        with self._lock:
+            routes, self._routes = self._routes, {}
+        return {route_str: stat.snapshot() for route_str, stat in routes.items()}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def to_prometheus(self, prefix="qubell_route"):
+        """Exports statistic in prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append("# HELP {0}_{1} {2}".format(prefix, name, help_text))
+            lines.append("# TYPE {0}_{1} {2}".format(prefix, name, kind))
+            for suffix, labels, value in samples:
+                label_str = ",".join('{0}="{1}"'.format(k, _label(v)) for k, v in labels)
+                lines.append(u"{0}_{1}{2}{{{3}}} {4}".format(prefix, name, suffix, label_str, value))
+
+        routes = sorted(snapshot.items())
+        latency = []
+        for route_str, stat in routes:
+            for name, q in PERCENTILES:
+                latency.append(("", (("route", route_str), ("quantile", q)), stat[name]))
+            latency.append(("_sum", (("route", route_str),), stat["sum"]))
+            latency.append(("_count", (("route", route_str),), stat["count"]))
+        metric("latency_ms", "summary", "Route call latency in milliseconds", latency)
+        metric("responses_total", "counter", "Responses by http status code",
+               [("", (("route", r), ("code", code)), n) for r, stat in routes for code, n in sorted(stat["statuses"].items())])
+        metric("errors_total", "counter", "Raised errors by exception class",
+               [("", (("route", r), ("exception", e)), n) for r, stat in routes for e, n in sorted(stat["errors"].items())])
+        metric("events_total", "counter", "Route events, that are not calls",
+               [("", (("route", r), ("event", e)), n) for r, stat in routes for e, n in sorted(stat["counters"].items())])
+        metric("request_bytes_total", "counter", "Request body bytes sent",
+               [("", (("route", r),), stat["bytes_sent"]) for r, stat in routes])
+        metric("response_bytes_total", "counter", "Response body bytes received",
+               [("", (("route", r),), stat["bytes_received"]) for r, stat in routes])
+        metric("breaker_open", "gauge", "Circuit breaker is open (1), half open (0.5) or closed (0)",
+               [("", (("route", r), ("tenant", t)), BREAKER_GAUGE[state])
+                for r, stat in routes for t, state in sorted(stat["breakers"].items())])
+        return u"\n".join(lines) + u"\n"
+
+    def log_lines(self):
+        snapshot = self.snapshot()
+        return ["  count: {0:<4} min: {1:<6} avg: {2:<6} max: {3:<6} p90: {4:<6} p99: {5:<6} {6}".format(
+            stat["count"], int(stat["min"]), int(stat["avg"]), int(stat["max"]), stat["p90"], stat["p99"], r)
+            for r, stat in sorted(snapshot.items())]
@@ -0,0 +1,62 @@
+"""
+Incremental decoding of large json array responses, e.g. organization dashboard.
+"""
+import re
+
+import simplejson as json
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARS = "0123456789.eE+-"
+
+
+def iter_json_array(chunks):
+    """
+    Yields items of top level json array from iterable of body chunks as they arrive,
+    memory holds current item and chunk only, not whole document.
+    Items are decoded by simplejson, item split between chunks is decoded once its end arrives.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buf, pos = "", 0
+    expect = "["  # "[" - array start, "item" - item or "]", "," - separator or "]"
+    error = None
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        if pos < len(buf):
+            char = buf[pos]
+            if expect == "[":
+                if char != "[":
+                    raise ValueError("Expected json array, got {0!r}".format(buf[pos:pos + 20]))
+                pos += 1
+                expect = "item"
+                continue
+            if char == "]":
+                return
+            if expect == ",":
+                if char != ",":
+                    raise ValueError("Expected ',' or ']' in json array, got {0!r}".format(buf[pos:pos + 20]))
+                pos += 1
+                expect = "item"
+                continue
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError as e:
+                error = e  # item is not complete yet, or broken
+            else:
+                # number, that ends at buffer end or is followed by number chars, may be cut by chunk boundary
+                if end < len(buf) and buf[end] not in NUMBER_CHARS:
+                    yield item
+                    pos = end
+                    expect = ","
+                    error = None
+                    continue
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise error or ValueError("Unexpected end of json array")
+        buf, pos = buf[pos:] + chunk, 0
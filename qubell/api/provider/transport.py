@@ -0,0 +1,85 @@
+"""
+Transports send http requests of Router. Default one is pooled keep-alive requests session,
+others can replace it, e.g. in-process fake backend (qubell.api.provider.fake).
+"""
+import threading
+import time
+
+__author__ = "Vasyl Khomenko"
+__copyright__ = "Copyright 2013, Qubell.com"
+__license__ = "Apache"
+__email__ = "vkhomenko@qubell.com"
+
+
+class Transport(object):
+    """
+    Base transport: request(method, url, **kwargs) returns requests.Response like object,
+    kwargs are the ones of requests.request. Cookies, set by responses, are kept in 'cookies'.
+    """
+    pool_maxsize = 10
+
+    @property
+    def cookies(self):
+        raise NotImplementedError
+
+    def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SessionTransport(Transport):
+    """
+    Pooled keep-alive requests session.
+    :param pool_connections: number of per host connection pools to keep
+    :param pool_maxsize: max connections kept alive per host
+    :param keep_alive: seconds, after which idle connections are dropped, None to keep them forever
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+
+        self._session = None
+        self._session_used = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        Returns pooled session, creates it on first use.
+        If session was idle longer than keep_alive, its connections are closed, pools are recreated on demand.
+        """
+        with self._session_lock:
+            now = time.time()
+            if self._session is None:
+                self._session = self._new_session()
+            elif self.keep_alive is not None and now - self._session_used > self.keep_alive:
+                self._session.close()
+            self._session_used = now
+            return self._session
+
+    def _new_session(self):
+        import requests  # takes a while, not imported until first request
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        """Closes all pooled connections"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
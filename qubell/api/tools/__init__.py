@@ -20,7 +20,6 @@ __license__ = "Apache"
 __email__ = "vkhomenko@qubell.com"
 
 from random import randrange
-import yaml
 import time
 import os
 import logging as log
@@ -68,6 +67,7 @@ def waitForStatus(instance, final='Running', accepted=None, timeout=(20, 10, 1))
 
     log.debug('Waiting status: %s' % final)
     import time
+    from qubell.api.private.exceptions import CircuitOpenError
 
     @retry(3, 1, 2) # max = 1 + 2 + 4 = 7 seconds + routes time
     def projection_update_monitor():
@@ -80,7 +80,11 @@ def waitForStatus(instance, final='Running', accepted=None, timeout=(20, 10, 1))
 
     @retry(*timeout) # ask status 20 times every 10 sec.
     def instance_status_waiter():
-        cur_status = instance.status
+        try:
+            cur_status = instance.status
+        except CircuitOpenError as e:
+            log.warning('Platform is degraded, waiting: %s' % e)
+            return False
         if cur_status in final:
             log.info('Got status: %s, continue' % cur_status)
             return True
@@ -107,6 +111,7 @@ def waitForStatus(instance, final='Running', accepted=None, timeout=(20, 10, 1))
 def dump(node):
     """ Dump initialized object structure to yaml
     """
+    import yaml
 
     from qubell.api.private.platform import Auth, QubellPlatform
     from qubell.api.private.organization import Organization
@@ -0,0 +1,144 @@
+import time
+
+import simplejson as json
+import unittest2
+from mock import patch
+
+from qubell.api.private import common
+from qubell.api.private.application import Application
+from qubell.api.private.instance import Instance
+from qubell.api.private.organization import Organization
+from qubell.api.private.platform import QubellPlatform
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router, ROUTER
+
+
+class FakeTenantTestCase(unittest2.TestCase):
+    """Signed in router over FakeQubell with one organization"""
+
+    def setUp(self):
+        self.fake = FakeQubell(users={"any@where": "***"})
+        self.router = Router("http://fake", transport=self.fake)
+        self.router.connect("any@where", "***")
+        self.org_id = self.router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+
+    def create_application(self, name="app"):
+        return self.router.post_organization_application(org_id=self.org_id, files={"path": "manifest"},
+                                                         data={"manifestSource": "upload", "name": name}).json()["id"]
+
+
+class EntityRouterTests(FakeTenantTestCase):
+    def test_entities_over_fake(self):
+        fake = FakeQubell()
+        with patch.object(ROUTER, "transport", fake), patch.object(ROUTER, "base_url", "http://fake"), \
+                patch.object(ROUTER, "_cookies", None), patch.object(ROUTER, "_auth", None):
+            ROUTER.connect("any@where", "***")
+            org = Organization.new("entities")
+            assert org.name == "entities"
+            assert org.defaultEnvironment.name == "default"
+            assert org.zone.name == "default zone"
+
+    def test_independent_routers(self):
+        first, second = FakeQubell(), FakeQubell()
+        platforms = [QubellPlatform.connect("http://first", "any@where", "***", router=Router("http://first", transport=first)),
+                     QubellPlatform.connect("http://second", "any@where", "***", router=Router("http://second", transport=second))]
+        for platform, name in zip(platforms, ["first org", "second org"]):
+            org = platform.organization(name=name)
+            assert org.router is platform.router
+            assert org.defaultEnvironment.router is platform.router
+        assert [o.name for o in platforms[0].organizations] == ["first org"]
+        assert [o.name for o in platforms[1].organizations] == ["second org"]
+        assert ROUTER.base_url not in ("http://first", "http://second")
+
+    def test_restore_launches_instance_once(self):
+        org = Organization(self.org_id, router=self.router)
+        app_id = self.create_application()
+        app = Application(org, app_id)
+        launch = self.fake.post_organization_instance
+
+        def slow_launch(*args, **kwargs):
+            time.sleep(0.2)
+            return launch(*args, **kwargs)
+
+        config = {"instances": [{"name": "same", "application": app}, {"name": "same", "application": app},
+                                {"name": "other", "application": app}],
+                  "applications": []}
+        with patch.object(self.fake, "post_organization_instance", slow_launch), \
+                patch.object(Instance, "ready", return_value=True):
+            org.restore(config)
+        assert sorted(i["name"] for i in self.router.get_instances(org_id=self.org_id).json()) == ["other", "same"]
+
+
+class EntityListSeedingTests(FakeTenantTestCase):
+    def test_entity_list_snapshot(self):
+        org = Organization(self.org_id, router=self.router)
+        org.create_environment("second")
+        self.fake.reset_requests()
+        names = [org.environments[i].name for i in range(len(org.environments))]
+        assert names == ["default", "second"]
+        assert self.fake.reset_requests().count(("GET", "/organizations/{0}/environments.json".format(self.org_id))) == 1
+
+    def test_entities_seeded_from_list(self):
+        org = Organization(self.org_id, router=self.router)
+        org.create_environment("second")
+        zone_id = self.fake.organizations[self.org_id]["backends"][0]["id"]
+        self.fake.reset_requests()
+        assert [(e.name, e.isDefault, e.zoneId) for e in org.environments] == \
+            [("default", True, zone_id), ("second", False, zone_id)]
+        assert [z.name for z in org.zones] == ["default zone"]
+        assert self.fake.reset_requests() == [("GET", "/organizations/{0}/environments.json".format(self.org_id)),
+                                              ("GET", "/organizations/{0}/zones.json".format(self.org_id))]
+
+        second = org.environments["second"]
+        org.create_environment("third")  # summary is outdated by change
+        assert not second.isDefault
+        assert ("GET", "/organizations/{0}/environments/{1}.json".format(self.org_id, second.id)) in self.fake.requests
+
+    def test_entity_handles_do_not_fetch(self):
+        self.router.post_organization(data=json.dumps({"name": "other"}))
+        self.fake.reset_requests()
+        org = Organization(self.org_id, router=self.router)
+        org.get_provider("0" * 24)
+        assert self.fake.reset_requests() == []
+        assert org.name == "org"
+
+        platform = QubellPlatform(router=self.router)
+        self.fake.reset_requests()
+        assert [o.name for o in platform.organizations] == ["org", "other"]
+        assert self.fake.reset_requests() == [("GET", "/organizations.json")]
+
+
+class EntityCacheTests(FakeTenantTestCase):
+    def test_entity_json_cached(self):
+        org = Organization(self.org_id, router=self.router)
+        app_id = self.create_application()
+        app_get = ("GET", "/organizations/{0}/applications/{1}.json".format(self.org_id, app_id))
+        app = org.get_application(id=app_id)
+        self.fake.reset_requests()
+        assert (app.name, len(app.revisions), len(app.instances)) == ("app", 0, 0)
+        assert self.fake.reset_requests().count(app_get) == 1
+
+        app.invalidate()
+        assert app.name == "app"
+        assert self.fake.reset_requests() == [app_get]
+
+        app.update(name="renamed")  # own change outdates cached json
+        self.fake.reset_requests()
+        assert app.name == "renamed"
+        assert self.fake.reset_requests() == [app_get]
+
+        with patch.object(common, "ENTITY_CACHE", False):
+            app.name, app.name
+            assert self.fake.reset_requests() == [app_get, app_get]
+
+        with patch.object(type(app), "json_ttl", 0):
+            app.name, app.name
+            assert self.fake.reset_requests() == [app_get, app_get]
+
+    def test_instance_list_is_cacheable(self):
+        org = Organization(self.org_id, router=self.router)
+        self.fake.reset_requests()
+        with self.router.cached(ttl=5):
+            org.instances.refresh()
+            org.instances.refresh()
+        assert self.fake.reset_requests() == [("GET", "/organizations/{0}/dashboard.json".format(self.org_id))]
@@ -1,5 +1,6 @@
 from qubell import deprecated
 import unittest2
+from mock import Mock
 
 from qubell.api.private.common import EntityList, IdName
 from qubell.api.private import exceptions
@@ -93,4 +94,82 @@ class EntityListTests(unittest2.TestCase):
         self.entity_list["name2"].plain_old_with_message()
 
     def test__repr(self):
+        self.entity_list.refresh()
         assert repr(self.entity_list) == "DummyEntityList([IdName(id='1', name='name1'), IdName(id='2', name='name2'), IdName(id='3', name='name3dup'), IdName(id='4', name='name3dup'), IdName(id='1234567890abcd1234567890', name='with_bson_id')])"
+
+
+class EntityListSnapshotTests(unittest2.TestCase):
+    class CountingList(EntityListTests.DummyEntityList):
+        def __init__(self, raw_json, ttl=None):
+            self.fetches = 0
+            self.raw_json = raw_json
+            EntityList.__init__(self, ttl)
+
+        def _id_name_list(self):
+            self.fetches += 1
+            EntityListTests.DummyEntityList._id_name_list(self)
+
+    def setUp(self):
+        self.raw_objects = list(EntityListTests.raw_objects)
+        self.entity_list = self.CountingList(self.raw_objects, ttl=60)
+
+    def test_fetched_on_first_use(self):
+        assert self.entity_list.fetches == 0
+        for i in range(len(self.entity_list)):
+            assert self.entity_list[i].id == self.raw_objects[i]["id"]
+        assert "name2" in self.entity_list
+        assert self.entity_list.fetches == 1
+
+    def test_repr_does_not_fetch(self):
+        assert repr(self.entity_list) == "CountingList([])"
+        len(self.entity_list)
+        self.raw_objects.append({"id": "5", "name": "new"})
+        self.entity_list._taken = None  # outdated snapshot
+        assert "new" not in repr(self.entity_list)
+        assert self.entity_list.fetches == 1
+
+    def test_refresh(self):
+        len(self.entity_list)
+        self.raw_objects.append({"id": "5", "name": "new"})
+        assert "new" not in self.entity_list
+        assert "new" in self.entity_list.refresh()
+        assert self.entity_list.fetches == 2
+
+    def test_ttl(self):
+        entity_list = self.CountingList(self.raw_objects, ttl=0)
+        len(entity_list)
+        len(entity_list)
+        assert entity_list.fetches == 2
+
+    def test_router_writes_outdate_snapshot(self):
+        self.entity_list.router = Mock(writes=0)
+        len(self.entity_list)
+        len(self.entity_list)
+        self.entity_list.router.writes = 1
+        len(self.entity_list)
+        assert self.entity_list.fetches == 2
+
+    def test_iteration_over_one_snapshot(self):
+        entity_list = self.CountingList(self.raw_objects, ttl=0)
+        ids = []
+        for entity in entity_list:
+            ids.append(entity.id)
+            self.raw_objects[:] = self.raw_objects[:1]
+            len(entity_list)
+        assert ids == [e["id"] for e in EntityListTests.raw_objects]
+
+    def test_indexes_built_once_per_snapshot(self):
+        indexes = self.entity_list._indexes()
+        assert self.entity_list["name3dup"].id == "4"
+        assert self.entity_list._indexes()[0] is indexes[0]
+        self.raw_objects.append({"id": "5", "name": "name3dup"})
+        self.entity_list.refresh()
+        assert self.entity_list["name3dup"].id == "5"
+        assert self.entity_list._indexes()[0] is not indexes[0]
+
+    def test_later_of_id_and_name_match_wins(self):
+        bson_id = "1234567890abcd1234567890"
+        self.raw_objects.append({"id": "6", "name": bson_id})
+        assert self.entity_list[bson_id].id == "6"
+        self.raw_objects.append({"id": bson_id, "name": "again"})
+        assert self.entity_list.refresh()[bson_id].name == "again"
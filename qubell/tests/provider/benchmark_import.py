@@ -0,0 +1,38 @@
+"""
+Benchmark of import time of client, every run imports it in fresh interpreter.
+Run: python -m qubell.tests.provider.benchmark_import [runs]
+"""
+import subprocess
+import sys
+
+MODULE = "qubell.api.private.platform"
+
+# heavy modules, that are imported on first use, not by import of client
+LAZY_MODULES = ("requests", "yaml", "multiprocessing")
+
+PROBE = """
+import sys, time
+start = time.time()
+import {module}
+elapsed = time.time() - start
+print elapsed, ",".join(sorted(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def measure(module=MODULE):
+    """Imports module in fresh interpreter, returns (seconds, list of lazy modules, that were imported)"""
+    output = subprocess.check_output([sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)])
+    elapsed, _, loaded = output.strip().partition(" ")
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+
+def benchmark(runs=10):
+    return sorted(measure()[0] for _ in range(runs))
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    times = benchmark(runs)
+    print "{0:>8.1f} ms  min".format(times[0] * 1000)
+    print "{0:>8.1f} ms  median".format(times[len(times) // 2] * 1000)
+    print "eagerly imported: {0}".format(", ".join(measure()[1]) or "none")
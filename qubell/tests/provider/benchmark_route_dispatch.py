@@ -0,0 +1,59 @@
+"""
+Micro-benchmark of route dispatch overhead, network is replaced with stub transport.
+Run: python -m qubell.tests.provider.benchmark_route_dispatch [calls]
+"""
+import sys
+import time
+
+from qubell.api.provider.router import Router
+from qubell.api.provider.transport import Transport
+
+
+class StubResponse(object):
+    status_code = 200
+    text = content = "{}"
+    headers = {}
+
+
+class StubTransport(Transport):
+    response = StubResponse()
+
+    def request(self, method, url, **kwargs):
+        return self.response
+
+
+def routes(router_clz):
+    for name in sorted(dir(router_clz)):
+        compiled = getattr(getattr(router_clz, name), "route", None)
+        if compiled:
+            yield name, compiled
+
+
+def call_args(compiled):
+    kwargs = {name: "0123456789abcdef01234567" for name in compiled.placeholders if name not in compiled.defaults}
+    kwargs.update({name: "{}" for name in compiled.required if name not in ("cookies", "auth") and name not in kwargs})
+    return kwargs
+
+
+def benchmark(calls=10000):
+    router = Router("http://stub", transport=StubTransport())
+    router._cookies = {"PLAY_SESSION": "stub"}
+
+    results = []
+    for name, compiled in routes(Router):
+        method = getattr(router, name)
+        kwargs = call_args(compiled)
+        start = time.time()
+        for _ in xrange(calls):
+            method(**kwargs)
+        elapsed = time.time() - start
+        results.append((elapsed * 1000000.0 / calls, compiled.route_str))
+    return results
+
+
+if __name__ == '__main__':
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    results = benchmark(calls)
+    for per_call, route_str in results:
+        print "{0:>8.2f} us  {1}".format(per_call, route_str)
+    print "{0:>8.2f} us  average per call".format(sum(r[0] for r in results) / len(results))
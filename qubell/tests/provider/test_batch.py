@@ -0,0 +1,59 @@
+import threading
+import time
+
+import simplejson as json
+import unittest2
+
+from qubell.api.private.exceptions import ApiNotFoundError
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router
+
+
+class BatchTests(unittest2.TestCase):
+    def setUp(self):
+        self.router = Router("http://fake", transport=FakeQubell())
+        self.router.connect("any@where", "***")
+        self.org_id = self.router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+
+    def test_results_in_submission_order(self):
+        def slow(value):
+            time.sleep(0.01 * (5 - value))
+            return value
+        with self.router.batch(max_workers=5) as batch:
+            for value in range(5):
+                assert batch.submit(slow, value) == value
+        assert batch.results == range(5)
+        assert batch.errors == [None] * 5
+
+    def test_errors_collected_per_call(self):
+        with self.router.batch() as batch:
+            batch.get_organization(org_id=self.org_id)
+            batch.get_application(org_id=self.org_id, app_id="0" * 24)
+            batch.get_zones(org_id=self.org_id)
+        assert batch.results[0].status_code == 200
+        assert batch.results[1] is None
+        assert isinstance(batch.errors[1], ApiNotFoundError)
+        assert batch.results[2].status_code == 200
+        with self.assertRaises(ApiNotFoundError):
+            batch.raise_errors()
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def call():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        with self.router.batch(max_workers=3) as batch:
+            for _ in range(12):
+                batch.submit(call)
+        assert running[1] <= 3
+
+    def test_not_a_route(self):
+        with self.assertRaises(AttributeError):
+            self.router.batch().connect
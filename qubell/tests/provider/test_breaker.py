@@ -0,0 +1,98 @@
+import unittest2
+from mock import patch, Mock
+
+from qubell.api.private.exceptions import CircuitOpenError, ApiError
+from qubell.api.provider import route, routes_stat
+from qubell.api.provider.breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN, breakers_for
+from qubell.api.provider.router import Router
+
+
+class CircuitBreakerTests(unittest2.TestCase):
+    def test_opens_on_error_ratio(self):
+        breaker = CircuitBreaker(error_ratio=0.5, min_calls=4, window=4)
+        for failed in (False, True, False):
+            assert breaker.allow()
+            breaker.record(failed)
+        assert breaker.state == CLOSED  # too few calls
+        breaker.allow()
+        breaker.record(True)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert 0 < breaker.retry_in <= 30
+
+    def test_half_open_trial_closes(self):
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=10, trial_calls=1)
+        breaker.allow()
+        breaker.record(True)
+        with patch("time.time", return_value=breaker.opened_at + 11):
+            assert breaker.allow()
+            assert breaker.state == HALF_OPEN
+            assert not breaker.allow()  # only trial call goes through
+            breaker.record(False)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_half_open_trial_reopens(self):
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=10)
+        breaker.allow()
+        breaker.record(True)
+        with patch("time.time", return_value=breaker.opened_at + 11):
+            breaker.allow()
+            breaker.record(True)
+        assert breaker.state == OPEN
+
+
+class BreakerRouter(Router):
+    @property
+    def is_connected(self): return True
+
+    @route("GET /organizations/{org_id}/dashboard", retry=False)
+    def get_dashboard(self, org_id): pass
+
+
+def response(code):
+    return Mock(status_code=code, text="", content="", headers={})
+
+
+@patch("requests.Session.request")
+class RouteBreakerTests(unittest2.TestCase):
+    def setUp(self):
+        self.router = BreakerRouter("http://breaker.org", connect_timeout=None, read_timeout=None)
+        self.router.enable_breaker(min_calls=2, window=2, reset_timeout=30)
+        routes_stat.reset()
+
+    def tearDown(self):
+        self.router.disable_breaker()
+
+    def test_fails_fast_when_open(self, request_mock):
+        request_mock.return_value = response(503)
+        for _ in range(2):
+            with self.assertRaises(ApiError):
+                self.router.get_dashboard(org_id="org")
+        with self.assertRaises(CircuitOpenError):
+            self.router.get_dashboard(org_id="org")
+        assert request_mock.call_count == 2
+
+        stat = routes_stat.snapshot()["GET /organizations/{org_id}/dashboard"]
+        assert stat["breakers"] == {"http://breaker.org": OPEN}
+        assert stat["counters"]["breaker_rejected"] == 1
+        assert 'breaker_open{route="GET /organizations/{org_id}/dashboard",tenant="http://breaker.org"} 1' in \
+            routes_stat.to_prometheus()
+
+    def test_shared_by_tenant(self, request_mock):
+        request_mock.side_effect = Exception("refused")
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                self.router.get_dashboard(org_id="org")
+        assert self.router.breakers is breakers_for("http://breaker.org")
+        assert breakers_for("http://breaker.org").states() == {"GET /organizations/{org_id}/dashboard": OPEN}
+
+    def test_client_errors_do_not_open(self, request_mock):
+        request_mock.return_value = response(404)
+        for _ in range(3):
+            with self.assertRaises(ApiError):
+                self.router.get_dashboard(org_id="org")
+        assert request_mock.call_count == 3
+
+    def test_disabled_by_default(self, request_mock):
+        assert Router("http://breaker.org").breakers is None
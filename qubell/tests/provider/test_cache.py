@@ -0,0 +1,96 @@
+import threading
+
+import simplejson as json
+import unittest2
+from mock import patch
+
+from qubell.api.provider.cache import ResponseCache
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router
+
+
+class ResponseCacheTests(unittest2.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(ttl=10, max_size=2)
+
+    def test_get_put(self):
+        self.cache.put("a", "org", 1)
+        assert self.cache.get("a") == 1
+        assert self.cache.get("b") is None
+
+    def test_expired(self):
+        self.cache.put("a", "org", 1)
+        with patch("time.time", return_value=10 ** 10):
+            assert self.cache.get("a") is None
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put("a", "org", 1)
+        self.cache.put("b", "org", 2)
+        self.cache.get("a")
+        self.cache.put("c", "org", 3)
+        assert self.cache.get("b") is None
+        assert self.cache.get("a") == 1
+        assert len(self.cache) == 2
+
+    def test_invalidate_scope(self):
+        self.cache.max_size = 10
+        self.cache.put("a", "org", 1)
+        self.cache.put("b", "other", 2)
+        self.cache.put("c", None, 3)
+        self.cache.invalidate("org")
+        assert self.cache.get("a") is None
+        assert self.cache.get("c") is None
+        assert self.cache.get("b") == 2
+
+
+class RouterCacheTests(unittest2.TestCase):
+    def setUp(self):
+        self.fake = FakeQubell()
+        self.router = Router("http://fake", transport=self.fake)
+        self.router.connect("any@where", "***")
+        self.org_id = self.router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+        self.fake.reset_requests()
+
+    def test_disabled_by_default(self):
+        self.router.get_organizations()
+        self.router.get_organizations()
+        assert len(self.fake.reset_requests()) == 2
+
+    def test_get_cached(self):
+        with self.router.cached(ttl=60):
+            first = self.router.get_zones(org_id=self.org_id).json()
+            assert self.router.get_zones(org_id=self.org_id).json() == first
+        assert self.router.cache is None
+        assert len(self.fake.reset_requests()) == 1
+
+    def test_write_through_invalidation(self):
+        with self.router.cached(ttl=60):
+            self.router.get_environments(org_id=self.org_id)
+            self.router.post_organization_environment(org_id=self.org_id, data=json.dumps({"name": "new"}))
+            envs = self.router.get_environments(org_id=self.org_id).json()
+        assert "new" in [e["name"] for e in envs]
+        assert len(self.fake.reset_requests()) == 3
+
+    def test_blocks_scoped_to_thread(self):
+        entered, leave = threading.Event(), threading.Event()
+        seen = {}
+
+        def other():
+            with self.router.cached(ttl=60) as cache:
+                seen["other"] = self.router.cache is cache
+                entered.set()
+                leave.wait(5)
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        entered.wait(5)
+        with self.router.cached(ttl=60) as cache:
+            assert self.router.cache is cache
+            leave.set()
+            thread.join(5)
+            assert self.router.cache is cache
+        assert seen["other"]
+        assert self.router.cache is None
+        self.router.get_zones(org_id=self.org_id)
+        self.router.get_zones(org_id=self.org_id)
+        assert len(self.fake.reset_requests()) == 2
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import time
+
+import simplejson as json
+import unittest2
+
+from qubell.api.private.exceptions import ApiUnauthorizedError
+from qubell.api.provider.cassette import ReplayTransport, ReplayError, scrub
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router
+
+
+def flow(router):
+    """Signs in, creates organization and application, launches instance and waits for it"""
+    router.connect("user@example.com", "top-secret")
+    org_id = router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+    app_id = router.post_organization_application(org_id=org_id, files={"path": "manifest"},
+                                                  data={"manifestSource": "upload", "name": "app"}).json()["id"]
+    instance_id = router.post_organization_instance(org_id=org_id, app_id=app_id,
+                                                    data=json.dumps({"instanceName": "ins"})).json()["id"]
+    statuses = [router.get_instance(org_id=org_id, instance_id=instance_id).json()["status"] for _ in range(3)]
+    router.put_instance_configuration(org_id=org_id, instance_id=instance_id,
+                                      data=json.dumps({"password": "db-secret", "size": 1}))
+    return org_id, statuses
+
+
+class CassetteTests(unittest2.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "flow.cassette")
+        self.fake = FakeQubell(users={"user@example.com": "top-secret"})
+        self.router = Router("http://fake", transport=self.fake)
+        with self.router.record(self.path):
+            self.recorded = flow(self.router)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_recording_restores_transport(self):
+        assert self.router.transport is self.fake
+        recorded = len(self.fake.requests)
+        self.router.get_organizations()
+        with open(self.path) as f:
+            assert len(f.readlines()) == recorded
+
+    def test_secrets_scrubbed(self):
+        with open(self.path) as f:
+            cassette = f.read()
+        for secret in ["user@example.com", "top-secret", "db-secret", self.fake.cookies["PLAY_SESSION"]]:
+            assert secret not in cassette
+        assert '\\"size\\": 1' in cassette
+
+    def test_replay(self):
+        replay = ReplayTransport(self.path)
+        replayed = flow(Router("http://replay", transport=replay))
+        assert replayed == self.recorded == (self.recorded[0], ["Launching", "Running", "Running"])
+        assert replay.requests == self.fake.requests
+
+    def test_last_response_repeated(self):
+        replay = ReplayTransport(self.path)
+        router = Router("http://replay", transport=replay)
+        org_id, _ = flow(router)
+        instance = router.get_instance(org_id=org_id, instance_id=self.fake.requests[-1][1].split("/")[4]).json()
+        assert instance["status"] == "Running"
+
+    def test_not_recorded(self):
+        router = Router("http://replay", transport=ReplayTransport(self.path))
+        router.connect("user@example.com", "top-secret")
+        with self.assertRaises(ReplayError):
+            router.get_organizations()
+
+    def test_failed_sign_in_replayed(self):
+        with self.router.record(self.path + ".gz"):
+            with self.assertRaises(ApiUnauthorizedError):
+                Router("http://fake", transport=self.router.transport).connect("user@example.com", "wrong")
+        router = Router("http://replay", transport=ReplayTransport(self.path + ".gz"))
+        with self.assertRaises(ApiUnauthorizedError):
+            router.connect("user@example.com", "wrong")
+
+    def test_rerecording_overwrites(self):
+        with self.router.record(self.path):
+            self.router.get_organizations()
+        with open(self.path) as f:
+            assert [json.loads(line)["path"] for line in f] == ["/organizations.json"]
+
+    def test_append(self):
+        with open(self.path) as f:
+            recorded = len(f.readlines())
+        with self.router.record(self.path, append=True):
+            self.router.get_organizations()
+        with open(self.path) as f:
+            assert len(f.readlines()) == recorded + 1
+
+    def test_latency(self):
+        router = Router("http://replay", transport=ReplayTransport(self.path, latency=0.05))
+        start = time.time()
+        router.connect("user@example.com", "top-secret")
+        assert time.time() - start >= 0.05
+
+    def test_scrub(self):
+        assert scrub({"email": "a", "nested": [{"apiToken": "b", "name": "c"}]}) == \
+            {"email": "***", "nested": [{"apiToken": "***", "name": "c"}]}
+        assert json.loads(scrub('{"securityGroup": "x", "privateKey": "y"}')) == {"securityGroup": "x", "privateKey": "***"}
+        assert scrub("{not json") == "{not json"
@@ -0,0 +1,74 @@
+import simplejson as json
+import unittest2
+
+from qubell.api.private.exceptions import ApiUnauthorizedError, ApiNotFoundError
+from qubell.api.provider.fake import FakeQubell, _routes
+from qubell.api.provider.router import Router
+
+
+class FakeQubellTests(unittest2.TestCase):
+    def setUp(self):
+        self.fake = FakeQubell(users={"any@where": "***"})
+        self.router = Router("http://fake", transport=self.fake)
+        self.router.connect("any@where", "***")
+        self.org_id = self.router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+
+    def test_every_route_is_served(self):
+        for _, _, name in _routes():
+            assert callable(getattr(self.fake, name, None)), "No fake for route {0}".format(name)
+
+    def test_wrong_password(self):
+        router = Router("http://fake", transport=FakeQubell(users={"any@where": "***"}))
+        with self.assertRaises(ApiUnauthorizedError):
+            router.connect("any@where", "wrong")
+
+    def test_expired_session_renewed(self):
+        self.fake.expire_sessions()
+        self.fake.reset_requests()
+        assert self.router.get_organizations().json()[0]["name"] == "org"
+        assert self.fake.reset_requests() == [("GET", "/organizations.json"), ("POST", "/signIn"),
+                                              ("GET", "/organizations.json")]
+
+    def test_expired_session_not_renewed(self):
+        self.fake.expire_sessions()
+        self.fake.users["any@where"] = "changed"
+        session = self.router.session
+        for _ in range(2):  # failed sign in keeps router connected with expired session
+            with self.assertRaises(ApiUnauthorizedError):
+                self.router.get_organizations()
+        assert self.router.session == session
+
+    def test_single_sign_in_for_concurrent_calls(self):
+        self.fake.expire_sessions()
+        self.fake.reset_requests()
+        with self.router.batch(max_workers=5) as batch:  # different routes, so they are not coalesced
+            batch.get_organizations()
+            for name in ("get_environments", "get_zones", "get_applications", "get_services"):
+                getattr(batch, name)(org_id=self.org_id)
+        batch.raise_errors()
+        assert self.fake.reset_requests().count(("POST", "/signIn")) == 1
+
+    def test_not_found(self):
+        with self.assertRaises(ApiNotFoundError):
+            self.router.get_application(org_id=self.org_id, app_id="0" * 24)
+
+    def test_organization(self):
+        orgs = self.router.get_organizations().json()
+        assert [o["name"] for o in orgs] == ["org"]
+        envs = self.router.get_environments(org_id=self.org_id).json()
+        assert [(e["name"], e["isDefault"]) for e in envs] == [("default", True)]
+        assert self.router.get_zones(org_id=self.org_id).json()[0]["isDefault"]
+
+    def test_instance_lifecycle(self):
+        app_id = self.router.post_organization_application(org_id=self.org_id, files={"path": "manifest"},
+                                                           data={"manifestSource": "upload", "name": "app"}).json()["id"]
+        instance_id = self.router.post_organization_instance(org_id=self.org_id, app_id=app_id,
+                                                             data=json.dumps({"instanceName": "ins"})).json()["id"]
+        status = lambda: self.router.get_instance(org_id=self.org_id, instance_id=instance_id).json()["status"]
+        assert [status() for _ in range(3)] == ["Launching", "Running", "Running"]
+
+        self.router.post_instance_workflow(org_id=self.org_id, instance_id=instance_id, wf_name="destroy")
+        assert [status() for _ in range(2)] == ["Destroyed", "Destroyed"]
+
+        app = self.router.get_application(org_id=self.org_id, app_id=app_id).json()
+        assert app["instances"][0]["name"] == "ins"
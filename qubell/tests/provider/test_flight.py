@@ -0,0 +1,76 @@
+import threading
+import time
+
+import unittest2
+
+from qubell.api.provider import routes_stat
+from qubell.api.provider.flight import SingleFlight
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router
+
+
+class BlockingFake(FakeQubell):
+    """Holds GET requests until released"""
+    def __init__(self):
+        FakeQubell.__init__(self)
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def request(self, method, url, **kwargs):
+        if method == "GET":
+            self.entered.set()
+            self.release.wait(5)
+        return FakeQubell.request(self, method, url, **kwargs)
+
+
+def run_threads(count, target):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    [t.start() for t in threads]
+    return threads, results
+
+
+class SingleFlightTests(unittest2.TestCase):
+    def test_calls_are_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        threads, results = run_threads(5, lambda: flight.do("key", call))
+        while not calls:
+            pass
+        release.set()
+        [t.join() for t in threads]
+        assert len(calls) == 1
+        assert sorted(results) == [("result", False)] + [("result", True)] * 4
+
+    def test_error_is_shared(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("key", lambda: int("nan"))
+        assert flight.do("key", lambda: 1) == (1, False)
+
+
+class RouterCoalescingTests(unittest2.TestCase):
+    def test_identical_gets_coalesced(self):
+        fake = BlockingFake()
+        router = Router("http://fake", transport=fake)
+        router.connect("any@where", "***")
+        fake.reset_requests()
+        routes_stat.reset()
+
+        threads, results = run_threads(5, lambda: router.get_organizations().status_code)
+        fake.entered.wait(5)
+        time.sleep(0.2)  # let others join the flight
+        fake.release.set()
+        [t.join() for t in threads]
+
+        assert results == [200] * 5
+        sent = len(fake.reset_requests())
+        assert sent == 1
+        assert routes_stat.snapshot()["GET /organizations{ctype}"]["counters"]["coalesced"] == 5 - sent
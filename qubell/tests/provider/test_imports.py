@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+import unittest2
+
+from qubell.tests.provider.benchmark_import import measure
+
+
+class ImportTests(unittest2.TestCase):
+    def test_heavy_modules_are_lazy(self):
+        elapsed, loaded = measure()
+        assert loaded == [], "{0} imported eagerly".format(", ".join(loaded))
+
+    def test_deprecation_filter_is_targeted(self):
+        import warnings
+        from qubell import deprecated, QubellDeprecationWarning
+
+        @deprecated
+        def old(): pass
+
+        with warnings.catch_warnings(record=True) as caught:
+            old()
+            old()
+        assert [w.category for w in caught] == [QubellDeprecationWarning] * 2
+
+        shown = subprocess.check_output([sys.executable, "-c", "import warnings, qubell; "
+                                         "print [f[2].__name__ for f in warnings.filters if f[0] == 'always']"])
+        assert shown.strip() == "['QubellDeprecationWarning']"
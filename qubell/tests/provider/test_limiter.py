@@ -0,0 +1,143 @@
+import threading
+import time
+
+import simplejson as json
+import unittest2
+from mock import patch
+
+from qubell.api.private.exceptions import ApiTimeoutError
+from qubell.api.provider import routes_stat
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.limiter import TokenBucket, ConcurrencyLimit, governor_for
+from qubell.api.provider.router import Router
+
+
+class TokenBucketTests(unittest2.TestCase):
+    def test_burst_is_free(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+
+    def test_waits_above_rate(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        bucket.acquire()
+        with patch("time.sleep") as sleep:
+            waited = bucket.acquire()
+        assert 0 < waited <= 0.1
+        sleep.assert_called_once_with(waited)
+
+
+class ConcurrencyLimitTests(unittest2.TestCase):
+    def test_additive_increase(self):
+        limit = ConcurrencyLimit(initial=4, maximum=10)
+        for _ in range(4):
+            limit.acquire()
+            limit.release(200, 10)
+        assert 4.9 < limit.limit < 5.1
+
+    def test_multiplicative_decrease_on_overload(self):
+        limit = ConcurrencyLimit(initial=8, minimum=2)
+        for code in (429, 503, 503):
+            limit.acquire()
+            limit.release(code, 10)
+        assert limit.limit == 2
+
+    def test_multiplicative_decrease_on_failure(self):
+        limit = ConcurrencyLimit(initial=8, minimum=2)
+        limit.acquire()
+        limit.release(failed=True)
+        assert limit.limit == 4
+
+    def test_decrease_on_rising_latency(self):
+        limit = ConcurrencyLimit(initial=8, latency_ratio=3)
+        limit.acquire()
+        limit.release(200, 10)
+        before = limit.limit
+        limit.acquire()
+        limit.release(200, 100)
+        assert limit.limit == before / 2
+
+
+class RouterLimitTests(unittest2.TestCase):
+    def held(self, router):
+        """Patches transport, so that calls wait for 'release' event, 'entered' is set when the first one is sent"""
+        entered, release = threading.Event(), threading.Event()
+        request = router.transport.request
+
+        def held_request(*args, **kwargs):
+            entered.set()
+            release.wait(5)
+            return request(*args, **kwargs)
+        return patch.object(router.transport, "request", side_effect=held_request), entered, release
+
+    def test_no_waits_without_contention(self):
+        router = Router("http://limited", transport=FakeQubell())
+        router.connect("any@where", "***")
+        router.limit(concurrency=2)
+        try:
+            assert router.governor is governor_for("http://limited")
+            assert Router("http://limited").governor is None  # opt-in per router
+            routes_stat.reset()
+            for _ in range(3):
+                router.get_organizations()
+            counters = routes_stat.snapshot()["GET /organizations{ctype}"]["counters"]
+            assert counters.get("limiter_waits", 0) == 0
+            assert counters.get("limiter_wait_ms", 0) == 0
+        finally:
+            router.unlimit()
+
+    def test_waits_reported(self):
+        router = Router("http://limited", transport=FakeQubell())
+        router.connect("any@where", "***")
+        router.limit(concurrency=1)
+        held, entered, release = self.held(router)
+        create = lambda: router.post_organization(data=json.dumps({"name": "org"}))  # writes are not coalesced
+        try:
+            routes_stat.reset()
+            with held:
+                first = threading.Thread(target=create)
+                first.start()
+                entered.wait(5)
+                second = threading.Thread(target=create)
+                second.start()
+                time.sleep(0.05)
+                release.set()
+                first.join(5)
+                second.join(5)
+            counters = routes_stat.snapshot()["POST /organizations{ctype}"]["counters"]
+            assert counters["limiter_waits"] == 1
+            assert counters["limiter_wait_ms"] >= 40
+        finally:
+            router.unlimit()
+
+    def test_reconfigured_in_flight(self):
+        router = Router("http://reconfigured", transport=FakeQubell())
+        router.connect("any@where", "***")
+        router.limit(concurrency=2)
+        before = router.governor.concurrency
+        held, entered, release = self.held(router)
+        try:
+            with held:
+                call = threading.Thread(target=router.get_organizations)
+                call.start()
+                entered.wait(5)
+                router.limit(concurrency=4)
+                release.set()
+                call.join(5)
+            assert before.in_flight == 0
+            assert router.governor.concurrency.in_flight == 0
+        finally:
+            router.unlimit()
+
+    def test_timeouts_shrink_limit(self):
+        from requests.exceptions import ReadTimeout
+        router = Router("http://timing-out", transport=FakeQubell())
+        router.connect("any@where", "***")
+        router.limit(concurrency=4)
+        try:
+            with patch.object(router.transport, "request", side_effect=ReadTimeout("read timed out")):
+                for _ in range(20):
+                    with self.assertRaises(ApiTimeoutError):
+                        router.post_organization(data=json.dumps({"name": "org"}))
+            assert router.governor.concurrency.limit == 1
+        finally:
+            router.unlimit()
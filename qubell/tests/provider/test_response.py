@@ -0,0 +1,48 @@
+import simplejson as json
+import unittest2
+from mock import patch, Mock
+
+from qubell.api.provider.fake import FakeQubell, FakeResponse
+from qubell.api.provider.response import ApiResponse
+from qubell.api.provider.router import Router
+
+
+class ApiResponseTests(unittest2.TestCase):
+    def test_json_decoded_once(self):
+        response = ApiResponse(FakeResponse(body=[{"id": "1"}]))
+        with patch("simplejson.loads", wraps=json.loads) as loads:
+            assert response.json() is response.json()
+        assert loads.call_count == 1
+
+    def test_copy_does_not_share_json(self):
+        response = ApiResponse(FakeResponse(body={"services": []}))
+        response.json()["services"].append("changed")
+        assert response.copy().json() == {"services": []}
+
+    def test_body_read_at_once(self):
+        raw = Mock(status_code=200, headers={}, content='{"a": 1}')
+        response = ApiResponse(raw)
+        raw.content = None  # connection released, body is kept by wrapper
+        assert response.json() == {"a": 1}
+
+    def test_raw_attributes(self):
+        raw = FakeResponse(body={})
+        raw.url = "http://fake/organizations.json"
+        assert ApiResponse(raw).url == raw.url
+
+
+class RouterResponseTests(unittest2.TestCase):
+    def setUp(self):
+        self.router = Router("http://fake", transport=FakeQubell())
+        self.router.connect("any@where", "***")
+        self.org_id = self.router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+
+    def test_route_returns_wrapper(self):
+        response = self.router.get_organizations()
+        assert isinstance(response, ApiResponse)
+        assert response.status_code == 200
+
+    def test_cache_hits_do_not_share_json(self):
+        with self.router.cached(ttl=60):
+            self.router.get_organization(org_id=self.org_id).json()["name"] = "changed"
+            assert self.router.get_organization(org_id=self.org_id).json()["name"] == "org"
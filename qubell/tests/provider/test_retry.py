@@ -0,0 +1,81 @@
+import unittest2
+from mock import patch, Mock
+from requests.exceptions import ConnectionError
+
+from qubell.api.private.exceptions import ApiError
+from qubell.api.provider import route, routes_stat
+from qubell.api.provider.retry import RetryBudget, RetryPolicy
+from qubell.api.provider.router import Router
+
+
+def response(code):
+    return Mock(status_code=code, text="", content="", headers={})
+
+
+class RetryPolicyTests(unittest2.TestCase):
+    def test_attempts(self):
+        policy = RetryPolicy(attempts=4, base=0.1, cap=1, budget=RetryBudget(reserve=100))
+        delays = list(policy.schedule())
+        assert len(delays) == 3
+        assert all(0.1 <= d <= 1 for d in delays)
+
+    def test_deadline(self):
+        policy = RetryPolicy(attempts=4, base=1, deadline=0.5, budget=RetryBudget(reserve=100))
+        assert list(policy.schedule()) == []
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        policy = RetryPolicy(attempts=3, base=0.01, budget=budget)
+        assert len(list(policy.schedule())) == 1  # reserve, deposit is capped
+        assert len(list(policy.schedule())) == 0  # half of token deposited
+        assert len(list(policy.schedule())) == 1
+
+
+class RetryRouter(Router):
+    @property
+    def is_connected(self): return True
+
+    @route("GET /get", retry=RetryPolicy(attempts=3, budget=RetryBudget(reserve=100)))
+    def get(self): pass
+
+    @route("PUT /put", idempotent=True, retry=RetryPolicy(attempts=3, budget=RetryBudget(reserve=100)))
+    def put(self, data): pass
+
+    @route("POST /post")
+    def post(self, data): pass
+
+
+@patch("time.sleep")
+@patch("requests.Session.request")
+class RouteRetryTests(unittest2.TestCase):
+    router = RetryRouter("http://nowhere.com")
+
+    def test_get_retried_on_5xx(self, request_mock, sleep_mock):
+        request_mock.side_effect = [response(503), response(500), response(200)]
+        assert self.router.get().status_code == 200
+        assert request_mock.call_count == 3
+        assert sleep_mock.call_count == 2
+
+    def test_gives_up_after_attempts(self, request_mock, sleep_mock):
+        request_mock.return_value = response(502)
+        with self.assertRaises(ApiError):
+            self.router.get()
+        assert request_mock.call_count == 3
+
+    def test_connection_error_retried(self, request_mock, sleep_mock):
+        request_mock.side_effect = [ConnectionError("reset"), response(200)]
+        routes_stat.reset()
+        assert self.router.put(data="{}").status_code == 200
+        assert routes_stat.snapshot()["PUT /put"]["counters"]["retries"] == 1
+
+    def test_client_errors_not_retried(self, request_mock, sleep_mock):
+        request_mock.return_value = response(404)
+        with self.assertRaises(ApiError):
+            self.router.get()
+        assert request_mock.call_count == 1
+
+    def test_post_not_retried(self, request_mock, sleep_mock):
+        request_mock.return_value = response(503)
+        with self.assertRaises(ApiError):
+            self.router.post(data="{}")
+        assert request_mock.call_count == 1
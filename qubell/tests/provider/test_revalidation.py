@@ -0,0 +1,102 @@
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import threading
+
+import simplejson as json
+import unittest2
+
+from qubell.api.provider import routes_stat
+from qubell.api.provider.cache import ValidatorCache
+from qubell.api.provider.fake import FakeResponse
+from qubell.api.provider.router import Router
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves organizations with ETag of current version, answers 304 if client has it"""
+    version = 1
+    seen = []
+
+    def do_GET(self):
+        etag = '"v{0}"'.format(StandInHandler.version)
+        StandInHandler.seen.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps([{"id": "1", "name": "org v{0}".format(StandInHandler.version)}])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RevalidationTests(unittest2.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StandInHandler.version = 1
+        StandInHandler.seen = []
+        self.router = Router("http://127.0.0.1:{0}".format(self.server.server_port), revalidate=True)
+        self.router._cookies = {"PLAY_SESSION": "any_val"}
+        routes_stat.reset()
+
+    def tearDown(self):
+        self.router.close()
+
+    def test_not_modified_served_from_last_response(self):
+        first = self.router.get_organizations().json()
+        second = self.router.get_organizations()
+        assert second.status_code == 200
+        assert second.json() == first
+        assert StandInHandler.seen == [None, '"v1"']
+        stat = routes_stat.snapshot()["GET /organizations{ctype}"]
+        assert stat["counters"]["not_modified"] == 1
+        assert stat["statuses"] == {200: 1, 304: 1}
+
+    def test_modified_body_replaces_last_one(self):
+        self.router.get_organizations()
+        StandInHandler.version = 2
+        assert self.router.get_organizations().json()[0]["name"] == "org v2"
+        assert self.router.get_organizations().json()[0]["name"] == "org v2"
+        assert StandInHandler.seen == [None, '"v1"', '"v2"']
+
+    def test_served_json_is_not_shared(self):
+        self.router.get_organizations().json()[0]["name"] = "changed"
+        assert self.router.get_organizations().json()[0]["name"] == "org v1"
+
+    def test_disabled_by_default(self):
+        self.router.disable_revalidation()
+        self.router.get_organizations()
+        self.router.get_organizations()
+        assert StandInHandler.seen == [None, None]
+
+
+class ValidatorCacheTests(unittest2.TestCase):
+    def test_only_responses_with_validators_kept(self):
+        cache = ValidatorCache(max_size=1)
+        cache.put("a", FakeResponse(body={}, headers={"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}))
+        assert ValidatorCache.conditions(cache.get("a")) == {"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        cache.put("a", FakeResponse(body={}))
+        assert cache.get("a") is None
+
+    def test_least_recently_used_evicted(self):
+        cache = ValidatorCache(max_size=1)
+        cache.put("a", FakeResponse(body={}, headers={"ETag": "1"}))
+        cache.put("b", FakeResponse(body={}, headers={"ETag": "2"}))
+        assert cache.get("a") is None
+        assert len(cache) == 1
@@ -2,7 +2,7 @@ import unittest2
 from mock import patch
 
 from qubell.api.private.exceptions import ApiUnauthorizedError, ApiAuthenticationError, ApiNotFoundError, ApiError
-from qubell.api.provider import route, play_auth, basic_auth
+from qubell.api.provider import route, play_auth, basic_auth, routes_stat
 
 from qubell.api.provider.router import Router
 
@@ -13,12 +13,13 @@ json_header = {'Content-Type': 'application/json'}
 def gen_response(code=200, resp_text="enjoy"):
     class DummyResponse:
         status_code = code
-        text = resp_text
+        text = content = resp_text
+        headers = {}
 
     return DummyResponse
 
 
-@patch("requests.request", create=True)
+@patch("requests.Session.request")
 class RouterDecoratorTests(unittest2.TestCase):
     class DummyRouter(Router):
         @property
@@ -49,7 +50,7 @@ class RouterDecoratorTests(unittest2.TestCase):
         @route("GET /simple.json")
         def get_simple_json(self, cookies): pass
 
-    router = DummyRouter("http://nowhere.com")
+    router = DummyRouter("http://nowhere.com", connect_timeout=None, read_timeout=None)
 
     def test_simple_get(self, request_mock):
         request_mock.return_value = gen_response()
@@ -59,7 +60,7 @@ class RouterDecoratorTests(unittest2.TestCase):
     def test_return_from_request(self, request_mock):
         ret_val = gen_response()
         request_mock.return_value = ret_val
-        assert self.router.get_simple_with_return() == ret_val
+        assert self.router.get_simple_with_return().raw is ret_val
         assert request_mock.called
 
     def test_simple_post(self, request_mock):
@@ -152,6 +153,17 @@ class RouterDecoratorTests(unittest2.TestCase):
         assert request_mock.called
         assert str(context.exception) == "Route POST /auth returned code=500 and error: server down"
 
+    def test_statistic_recorded(self, request_mock):
+        routes_stat.reset()
+        request_mock.return_value = gen_response(404, "nothing")
+        with self.assertRaises(ApiNotFoundError):
+            self.router.post_something_publicly()
+        stat = routes_stat.snapshot()["POST /auth"]
+        assert stat["count"] == 1
+        assert stat["statuses"] == {404: 1}
+        assert stat["errors"] == {"ApiNotFoundError": 1}
+        assert stat["bytes_received"] == len("nothing")
+
     def test_errors_can_be_ignored(self, request_mock):
         """Should not propagate errors if verify_codes turned off"""
         try:
@@ -160,8 +172,25 @@ class RouterDecoratorTests(unittest2.TestCase):
 
             ret_val = gen_response(404, "you hidded")
             request_mock.return_value = ret_val
-            assert self.router.post_something_publicly() == ret_val
+            assert self.router.post_something_publicly().raw is ret_val
             assert request_mock.called
 
         finally:
-            self.router.verify_codes = True
\ No newline at end of file
+            self.router.verify_codes = True
+
+class CompiledRouteTests(unittest2.TestCase):
+    def test_route_compiled_once(self):
+        compiled = Router.get_instance.route
+        assert compiled.method == "GET"
+        assert compiled.placeholders == ["org_id", "instance_id", "ctype"]
+        assert compiled.defaults == {"ctype": ".json"}
+        assert compiled.bypass == ("cookies",)
+
+    def test_path(self):
+        compiled = Router.get_instance.route
+        assert compiled.path({"org_id": "o", "instance_id": "i", "ctype": ".json"}) == "/organizations/o/instances/i.json"
+
+    def test_files_are_not_json(self):
+        compiled = Router.post_application_manifest.route
+        assert compiled.multipart
+        assert "headers" not in compiled.request_args({"data": "d", "files": "f", "cookies": "c"}, "/any.json")
@@ -1,3 +1,5 @@
+import threading
+
 from mock import patch, Mock
 import unittest2
 
@@ -26,14 +28,10 @@ class RouterTests(unittest2.TestCase):
 
     def test_get_connected(self):
         cooka = {"PLAY_SESSION": "damn_cookie_mock"}
+        session = Mock(cookies={})
+        session.request.side_effect = lambda *args, **kwargs: session.cookies.update(cooka)
 
-        def session_mock():
-            session = Mock(cookies=cooka)
-            session.__enter__ = lambda self: session
-            session.__exit__ = Mock()
-            return session
-
-        with patch("requests.session", return_value=session_mock()):
+        with patch.object(self.router.transport, "_session", session):
             self.router.connect("any@where", "***")
         assert self.router.is_connected
         assert self.router._cookies == cooka
@@ -43,7 +41,70 @@ class RouterTests(unittest2.TestCase):
 
 
     def test_exception_if_not_get_connected(self):
-        with self.assertRaises(ApiUnauthorizedError) as context, patch("requests.session"):
+        with self.assertRaises(ApiUnauthorizedError) as context, patch.object(self.router.transport, "_session", Mock(cookies={})):
             self.router.connect("any@where", "**wrong**")
         assert context.exception.message == "Authentication failed, please check settings"
 
+    def test_session_is_pooled(self):
+        transport = self.router.transport
+        session = transport.session
+        assert session is transport.session
+        adapter = session.get_adapter("https://router.org")
+        assert adapter is session.get_adapter("http://router.org")
+        assert adapter._pool_connections == transport.pool_connections
+        assert adapter._pool_maxsize == transport.pool_maxsize
+
+    def test_idle_session_connections_dropped(self):
+        transport = self.router.transport
+        transport.keep_alive = 5
+        session = transport.session
+        transport._session_used -= 10
+        with patch.object(session, "close") as close:
+            assert transport.session is session
+        assert close.called
+
+
+class AsyncRouterTests(unittest2.TestCase):
+    def setUp(self):
+        self.router = Router("http://router.org")
+        self.router._cookies = {"PLAY_SESSION": "any_val"}
+
+    def tearDown(self):
+        self.router.async_router.close()
+
+    def test_async_router_is_shared(self):
+        assert self.router.async_router is self.router.async_router
+
+    def test_waits_do_not_hold_calls(self):
+        release = threading.Event()
+        waits = [self.router.async_router.submit_wait(release.wait, 5) for _ in range(12)]
+        try:
+            assert self.router.async_router.submit(lambda: "done").get(1) == "done"
+        finally:
+            release.set()
+        assert all(wait.get(5) for wait in waits)
+
+    def test_close_stops_pool(self):
+        pool = self.router.async_router.pool
+        self.router.close()
+        assert not any(worker.is_alive() for worker in pool._pool)
+        assert self.router.async_router.pool is not pool
+
+    def test_route_is_called_in_pool(self):
+        response = Mock(status_code=200, headers={}, content="")
+        with patch("requests.Session.request", return_value=response) as request_mock:
+            result = self.router.async_router.get_instance(org_id="org", instance_id="ins")
+            assert result.get(5).raw is response
+        request_mock.assert_called_once_with('GET', 'http://router.org/organizations/org/instances/ins.json',
+                                             verify=False, cookies=self.router._cookies, timeout=(10, 120),
+                                             headers={'Content-Type': 'application/json'})
+
+    def test_errors_are_raised_on_get(self):
+        with patch("requests.Session.request", return_value=Mock(status_code=401, text="expired", headers={}, content="expired")):
+            result = self.router.async_router.get_organizations()
+            with self.assertRaises(ApiUnauthorizedError):
+                result.get(5)
+
+    def test_not_a_route(self):
+        with self.assertRaises(AttributeError):
+            self.router.async_router.connect
@@ -0,0 +1,80 @@
+import os
+import shutil
+import stat
+import tempfile
+
+import unittest2
+
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router
+from qubell.api.provider.session import SessionStore
+
+
+class SessionStoreTests(unittest2.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = SessionStore(os.path.join(self.dir, "qubell", "sessions.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_save_load(self):
+        assert self.store.load("http://tenant", "user") is None
+        self.store.save("http://tenant", "user", "session-1")
+        self.store.save("http://other", "user", "session-2")
+        assert self.store.load("http://tenant", "user") == "session-1"
+        self.store.forget("http://tenant", "user")
+        assert self.store.load("http://tenant", "user") is None
+        assert self.store.load("http://other", "user") == "session-2"
+
+    def test_owner_only(self):
+        self.store.save("http://tenant", "user", "session-1")
+        assert stat.S_IMODE(os.stat(self.store.path).st_mode) == 0600
+        assert stat.S_IMODE(os.stat(os.path.dirname(self.store.path)).st_mode) == 0700
+
+    def test_accessible_by_others_ignored(self):
+        self.store.save("http://tenant", "user", "session-1")
+        os.chmod(self.store.path, 0644)
+        assert self.store.load("http://tenant", "user") is None
+
+    def test_broken_ignored(self):
+        os.makedirs(os.path.dirname(self.store.path))
+        with open(self.store.path, "w") as f:
+            f.write("{broken")
+        os.chmod(self.store.path, 0600)
+        assert self.store.load("http://tenant", "user") is None
+
+
+class RouterSessionStoreTests(unittest2.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = SessionStore(os.path.join(self.dir, "sessions.json"))
+        self.fake = FakeQubell()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def router(self):
+        return Router("http://fake", transport=self.fake, session_store=self.store)
+
+    def test_session_reused(self):
+        self.router().connect("any@where", "***")
+        self.fake.reset_requests()
+
+        router = self.router()
+        router.connect("any@where", "***")
+        assert self.fake.reset_requests() == []  # no sign in
+        router.get_organizations()
+        assert self.fake.reset_requests() == [("GET", "/organizations.json")]
+
+    def test_expired_session_renewed(self):
+        self.router().connect("any@where", "***")
+        self.fake.expire_sessions()
+        self.fake.reset_requests()
+
+        router = self.router()
+        router.connect("any@where", "***")
+        router.get_organizations()
+        assert self.fake.reset_requests() == [("GET", "/organizations.json"), ("POST", "/signIn"),
+                                              ("GET", "/organizations.json")]
+        assert self.store.load("http://fake", "any@where") == router._cookies["PLAY_SESSION"]
@@ -0,0 +1,98 @@
+from StringIO import StringIO
+import threading
+
+import simplejson as json
+import unittest2
+
+from qubell.api.provider import _body_size
+from qubell.api.provider.stats import RouteMetrics, Histogram
+
+
+class HistogramTests(unittest2.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.add(value)
+        assert 450 <= histogram.percentile(0.5, 1000) <= 550
+        assert 900 <= histogram.percentile(0.99, 1000) <= 1000
+        assert histogram.percentile(0.999, 1000) == 1000
+
+    def test_empty(self):
+        assert Histogram().percentile(0.5, 0) == 0
+
+    def test_memory_is_bounded(self):
+        histogram = Histogram()
+        size = len(histogram.counts)
+        for value in range(100000):
+            histogram.add(value)
+        assert len(histogram.counts) == size
+
+
+class RouteMetricsTests(unittest2.TestCase):
+    def setUp(self):
+        self.metrics = RouteMetrics()
+
+    def test_record(self):
+        self.metrics.record("GET /a", 10, status=200, received=100)
+        self.metrics.record("GET /a", 30, status=500, error="ApiError", sent=5)
+        stat = self.metrics.snapshot()["GET /a"]
+        assert stat["count"] == 2
+        assert stat["min"] == 10
+        assert stat["max"] == 30
+        assert stat["avg"] == 20
+        assert stat["statuses"] == {200: 1, 500: 1}
+        assert stat["errors"] == {"ApiError": 1}
+        assert stat["bytes_sent"] == 5
+        assert stat["bytes_received"] == 100
+
+    def test_reset(self):
+        self.metrics.record("GET /a", 10)
+        before = self.metrics.reset()
+        assert before["GET /a"]["count"] == 1
+        assert self.metrics.snapshot() == {}
+
+    def test_threads(self):
+        def work():
+            for _ in range(1000):
+                self.metrics.record("GET /a", 1)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        assert self.metrics.snapshot()["GET /a"]["count"] == 8000
+
+    def test_json(self):
+        self.metrics.record("GET /a", 10, status=200)
+        assert json.loads(self.metrics.to_json())["GET /a"]["count"] == 1
+
+    def test_prometheus(self):
+        self.metrics.record('GET /a"b', 10, status=200, error="ApiError")
+        text = self.metrics.to_prometheus()
+        assert '# TYPE qubell_route_latency_ms summary' in text
+        assert 'qubell_route_latency_ms_count{route="GET /a\\"b"} 1' in text
+        assert 'qubell_route_responses_total{route="GET /a\\"b",code="200"} 1' in text
+        assert 'qubell_route_errors_total{route="GET /a\\"b",exception="ApiError"} 1' in text
+
+
+class BodySizeTests(unittest2.TestCase):
+    def test_string(self):
+        assert _body_size('{"a": 1}') == 8
+
+    def test_form_and_files(self):
+        manifest = StringIO("application: {}")
+        manifest.read(3)
+        size = _body_size({"name": "app", "version": 2}, {"path": ("manifest.yml", manifest, "text/yaml"),
+                                                           "other": "12345"})
+        assert size == len("name") + 3 + len("version") + 1 + len("lication: {}") + 5
+        assert manifest.tell() == 3  # not consumed
+
+    def test_routed_upload_counted(self):
+        from qubell.api.provider import routes_stat
+        from qubell.api.provider.fake import FakeQubell
+        from qubell.api.provider.router import Router
+        router = Router("http://fake", transport=FakeQubell())
+        router.connect("any@where", "***")
+        org_id = router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+        routes_stat.reset()
+        router.post_organization_application(org_id=org_id, files={"path": "x" * 1000},
+                                             data={"manifestSource": "upload", "name": "app"})
+        assert routes_stat.snapshot()["POST /organizations/{org_id}/applications{ctype}"]["bytes_sent"] > 1000
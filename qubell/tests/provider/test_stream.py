@@ -0,0 +1,71 @@
+import simplejson as json
+import unittest2
+from mock import patch
+
+from qubell.api.provider.fake import FakeQubell
+from qubell.api.provider.router import Router, ROUTER
+from qubell.api.provider.stream import iter_json_array
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class IterJsonArrayTests(unittest2.TestCase):
+    items = [{"id": "1", "name": "a \"quoted\" ]", "status": "Running"}, 12345, [1, [2]], None, u"\u044e", 1.5e3]
+
+    def test_any_chunk_size(self):
+        text = json.dumps(self.items, indent=1)
+        for size in range(1, len(text) + 1):
+            assert list(iter_json_array(chunked(text, size))) == self.items, size
+
+    def test_utf8_bytes_split(self):
+        text = json.dumps([u"\u044e\u044e"], ensure_ascii=False).encode("utf-8")
+        assert list(iter_json_array(chunked(text, 1))) == [u"\u044e\u044e"]
+
+    def test_empty(self):
+        assert list(iter_json_array([" [ ", " ] "])) == []
+
+    def test_items_yielded_before_end(self):
+        items = iter_json_array(iter(['[{"a": 1}, ', '{"b"']))
+        assert next(items) == {"a": 1}
+        with self.assertRaises(ValueError):
+            next(items)  # truncated document
+
+    def test_not_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['{"a": 1}']))
+
+    def test_broken(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['[1 2]']))
+
+
+class StreamedRouteTests(unittest2.TestCase):
+    def test_instances_streamed(self):
+        from qubell.api.private.organization import Organization
+        fake = FakeQubell()
+        with patch.object(ROUTER, "transport", fake), patch.object(ROUTER, "base_url", "http://fake"), \
+                patch.object(ROUTER, "_cookies", None), patch.object(ROUTER, "_auth", None):
+            ROUTER.connect("any@where", "***")
+            org = Organization.new("streamed")
+            app_id = ROUTER.post_organization_application(org_id=org.organizationId, files={"path": "manifest"},
+                                                          data={"manifestSource": "upload", "name": "app"}).json()["id"]
+            for name in ("one", "two", "dead"):
+                ROUTER.post_organization_instance(org_id=org.organizationId, app_id=app_id,
+                                                  data=json.dumps({"instanceName": name}))
+            dead = [i for i in org.list_instances_json() if i["name"] == "dead"][0]
+            ROUTER.post_instance_workflow(org_id=org.organizationId, instance_id=dead["id"], wf_name="destroy")
+
+            assert sorted(i["name"] for i in org.iter_instances_json()) == ["one", "two"]
+            assert sorted(i.name for i in org.instances) == ["one", "two"]
+
+    def test_streamed_response_not_shared(self):
+        router = Router("http://fake", transport=FakeQubell())
+        router.connect("any@where", "***")
+        org_id = router.post_organization(data=json.dumps({"name": "org"})).json()["id"]
+        with router.cached(ttl=60) as cache:
+            response = router.get_instances(org_id=org_id, stream=True)
+            assert response.streamed
+            assert list(response.iter_json()) == []
+            assert len(cache) == 0
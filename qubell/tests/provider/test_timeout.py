@@ -0,0 +1,144 @@
+import threading
+import time
+
+import unittest2
+from mock import patch, Mock
+from requests.exceptions import ReadTimeout
+
+from qubell.api.private.exceptions import ApiTimeoutError
+from qubell.api.provider import route
+from qubell.api.provider.retry import RetryPolicy, RetryBudget
+from qubell.api.provider.router import Router
+
+
+def response(code=200):
+    return Mock(status_code=code, text="", content="", headers={})
+
+
+class TimeoutRouter(Router):
+    @property
+    def is_connected(self): return True
+
+    @route("GET /get", retry=RetryPolicy(attempts=3, budget=RetryBudget(reserve=100)))
+    def get(self): pass
+
+    @route("GET /slow", timeout=(1, 600))
+    def get_slow(self): pass
+
+
+@patch("requests.Session.request")
+class RouteTimeoutTests(unittest2.TestCase):
+    router = TimeoutRouter("http://nowhere.com")
+
+    def test_default_timeout(self, request_mock):
+        request_mock.return_value = response()
+        self.router.get()
+        request_mock.assert_called_once_with('GET', 'http://nowhere.com/get', verify=False, timeout=(10, 120))
+
+    def test_route_timeout(self, request_mock):
+        request_mock.return_value = response()
+        self.router.get_slow()
+        request_mock.assert_called_once_with('GET', 'http://nowhere.com/slow', verify=False, timeout=(1, 600))
+
+    def test_no_timeout(self, request_mock):
+        request_mock.return_value = response()
+        router = TimeoutRouter("http://nowhere.com", connect_timeout=None, read_timeout=None)
+        router.get()
+        request_mock.assert_called_once_with('GET', 'http://nowhere.com/get', verify=False)
+
+    def test_timeout_is_retried(self, request_mock):
+        request_mock.side_effect = [ReadTimeout("slow"), response()]
+        with patch("time.sleep"):
+            assert self.router.get().status_code == 200
+        assert request_mock.call_count == 2
+
+    def test_timeout_raised(self, request_mock):
+        request_mock.side_effect = ReadTimeout("slow")
+        with self.assertRaises(ApiTimeoutError):
+            self.router.get_slow()
+
+    def test_deadline_clips_timeout(self, request_mock):
+        request_mock.return_value = response()
+        with self.router.deadline(5):
+            self.router.get()
+        connect, read = request_mock.call_args[1]["timeout"]
+        assert 4 < connect <= 5 and 4 < read <= 5
+
+    def test_deadline_exceeded(self, request_mock):
+        with self.router.deadline_at(time.time() - 1):
+            with self.assertRaises(ApiTimeoutError):
+                self.router.get()
+        assert not request_mock.called
+
+    def test_nested_deadline_is_shorter(self, request_mock):
+        with self.router.deadline(5):
+            outer = self.router.current_deadline
+            with self.router.deadline(60):
+                assert self.router.current_deadline == outer
+            with self.router.deadline(1):
+                assert self.router.current_deadline < outer
+        assert self.router.current_deadline is None
+
+    def test_deadline_propagates_to_batch(self, request_mock):
+        request_mock.return_value = response()
+        with self.router.deadline(5):
+            with self.router.batch(max_workers=2) as batch:
+                batch.get()
+                batch.submit(lambda: self.router.current_deadline)
+        batch.raise_errors()
+        connect, read = request_mock.call_args[1]["timeout"]
+        assert read <= 5
+        assert batch.results[1] is not None
+
+    def test_deadline_propagates_to_async_router(self, request_mock):
+        try:
+            with self.router.deadline(5):
+                result = self.router.async_router.submit(lambda: self.router.current_deadline)
+            assert result.get(5) is not None
+        finally:
+            self.router.async_router.close()
+
+
+class DeadlineWaitTests(unittest2.TestCase):
+    def test_sign_in_timeout(self):
+        router = Router("http://nowhere.com")
+        session = Mock(cookies={})
+        session.request.side_effect = ReadTimeout("slow")
+        with patch.object(router.transport, "_session", session):
+            with self.assertRaises(ApiTimeoutError):
+                router.connect("any@where", "***")
+            assert session.request.call_args[1]["timeout"] == (10, 120)
+            with router.deadline_at(time.time() - 1), self.assertRaises(ApiTimeoutError):
+                router.connect("any@where", "***")
+        assert session.request.call_count == 1
+
+    def test_coalesced_wait_bounded_by_deadline(self):
+        from qubell.api.provider.flight import SingleFlight
+        flight = SingleFlight()
+        entered, release = threading.Event(), threading.Event()
+        leader = threading.Thread(target=lambda: flight.do("key", lambda: entered.set() or release.wait(5)))
+        leader.start()
+        entered.wait(5)
+        try:
+            start = time.time()
+            with self.assertRaises(ApiTimeoutError):
+                flight.do("key", lambda: None, deadline=time.time() + 0.1)
+            assert time.time() - start < 1
+        finally:
+            release.set()
+            leader.join()
+
+    def test_governor_wait_bounded_by_deadline(self):
+        from qubell.api.provider.limiter import ConcurrencyLimit, TokenBucket
+        limit = ConcurrencyLimit(initial=1)
+        limit.acquire()
+        start = time.time()
+        with self.assertRaises(ApiTimeoutError):
+            limit.acquire(deadline=time.time() + 0.1)
+        assert time.time() - start < 1
+        assert limit.in_flight == 1
+
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.acquire()
+        with self.assertRaises(ApiTimeoutError):
+            bucket.acquire(deadline=time.time() + 0.1)